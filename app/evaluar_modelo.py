@@ -0,0 +1,57 @@
+"""
+Evalúa la precisión del modelo configurado (CLASS_MODEL) sobre los PDFs de /data.
+
+La categoría esperada se toma del prefijo del nombre de archivo que asigna
+generacion_archivos.py (ej: CT-001_Contrato.pdf -> CONTRATO). Se omite la
+clasificación por reglas para medir solo al LLM.
+
+Uso:
+    $ CLASS_MODEL=qwen2.5:3b-instruct-q4_K_M python evaluar_modelo.py
+"""
+import os
+import sys
+import glob
+import asyncio
+import fitz
+
+from main_clasificacion_Text import MODEL_NAME, BATCH_SIZE, classify_batch, extract_text_smart
+
+# Prefijo del nombre de archivo -> categoría esperada
+CATEGORIA_POR_PREFIJO = {
+    "QR": "QUEJA_RECLAMO",
+    "CT": "CONTRATO",
+    "RA": "RESOLUCION_ADMINISTRATIVA",
+    "IT": "INFORME_TECNICO",
+    "CI": "COMUNICACION_INTERNA",
+}
+
+# PDFs etiquetados (los que no siguen la convención de nombres se ignoran)
+etiquetados = [p for p in sorted(glob.glob("/data/*.pdf"))
+               if os.path.basename(p)[:2] in CATEGORIA_POR_PREFIJO]
+
+if not etiquetados:
+    print("No se encontraron PDFs etiquetados en /data.")
+    sys.exit(1)
+
+textos = []
+for path in etiquetados:
+    with fitz.open(path) as doc:
+        textos.append(extract_text_smart(doc))
+
+async def clasificar():
+    lotes = [textos[i:i + BATCH_SIZE] for i in range(0, len(textos), BATCH_SIZE)]
+    resultados = await asyncio.gather(*(classify_batch(lote) for lote in lotes))
+    return [r for lote in resultados for r in lote]
+
+print(f"Evaluando {MODEL_NAME} con {len(etiquetados)} documentos...\n")
+resultados = asyncio.run(clasificar())
+
+aciertos = 0
+for path, result in zip(etiquetados, resultados):
+    nombre = os.path.basename(path)
+    esperada = CATEGORIA_POR_PREFIJO[nombre[:2]]
+    ok = result["categoria"] == esperada
+    aciertos += ok
+    print(f"{'OK ' if ok else 'ERR'} {nombre}: {result['categoria']} (esperada {esperada}, score {result['score']})")
+
+print(f"\nPrecisión: {aciertos}/{len(etiquetados)} ({aciertos / len(etiquetados):.0%})")
@@ -1,25 +1,36 @@
 import os
+import copy
 import random
 import datetime
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from faker import Faker
 from reportlab.lib.pagesizes import LETTER
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.enums import TA_JUSTIFY, TA_CENTER, TA_RIGHT
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from reportlab.platypus import BaseDocTemplate, PageTemplate, Frame, Paragraph, Spacer, Table, TableStyle
 from reportlab.lib import colors
 from reportlab.lib.units import inch
 
+@lru_cache(maxsize=None)
+def get_faker(locale='es_CO'):
+    """Retorna una instancia de Faker reutilizable por locale (se crea una sola vez)."""
+    return Faker(locale)
+
 # Configuración inicial
-fake = Faker('es_CO')
+fake = get_faker()
 BASE_DIR = "documentos_generados"
 TIPOS_DOCS = {
-    "quejas_reclamos": {"prefijo": "QR", "nombre": "Queja y Reclamo"},
-    "contratos": {"prefijo": "CT", "nombre": "Contrato"},
-    "resoluciones_administrativas": {"prefijo": "RA", "nombre": "Resolución"},
-    "informes_tecnicos": {"prefijo": "IT", "nombre": "Informe Técnico"},
-    "comunicaciones_internas": {"prefijo": "CI", "nombre": "Memorando Interno"}
+    "quejas_reclamos": {"prefijo": "QR", "nombre": "Queja y Reclamo", "metodo": "generar_queja"},
+    "contratos": {"prefijo": "CT", "nombre": "Contrato", "metodo": "generar_contrato"},
+    "resoluciones_administrativas": {"prefijo": "RA", "nombre": "Resolución", "metodo": "generar_resolucion"},
+    "informes_tecnicos": {"prefijo": "IT", "nombre": "Informe Técnico", "metodo": "generar_informe"},
+    "comunicaciones_internas": {"prefijo": "CI", "nombre": "Memorando Interno", "metodo": "generar_comunicacion"}
 }
+# Párrafos de texto invariable ya parseados, compartidos por todos los generadores del proceso
+_PARRAFOS_FIJOS = {}
+MESES_ES = ("enero", "febrero", "marzo", "abril", "mayo", "junio", "julio", "agosto", "septiembre", "octubre", "noviembre", "diciembre")
 
 def generar_nit():
     """Genera un NIT colombiano ficticio con formato válido (9 dígitos + dígito de verificación)."""
@@ -29,9 +40,27 @@ def generar_nit():
     return f"{base}-{digito_verificacion}"
 
 class GeneradorDocumentosCol:
+    # Coordenadas fijas del encabezado y pie de página (en puntos)
+    HEADER_X = inch
+    HEADER_TITULO_Y = 10.5 * inch
+    HEADER_NIT_Y = 10.35 * inch
+    HEADER_LINEA_Y = 10.3 * inch
+    MARGEN_DERECHO_X = 7.5 * inch
+    FOOTER_Y = 0.75 * inch
+
+    # Estilos de tabla compartidos (Table.setStyle solo lee los comandos, no modifica el estilo)
+    _FIRMA_STYLE = TableStyle([('ALIGN', (0,0), (-1,-1), 'CENTER'), ('VALIGN', (0,0), (-1,-1), 'BOTTOM')])
+    _HEADER_TABLE_STYLE = TableStyle([('FONTNAME', (0,0), (0,-1), 'Helvetica-Bold'), ('ALIGN', (0,0), (-1,-1), 'LEFT')])
+
     def __init__(self):
         self.styles = getSampleStyleSheet()
         self._crear_estilos_personalizados()
+        # Datos del encabezado calculados una sola vez (no en cada página)
+        self._header_nit = generar_nit()
+        self._header_city = get_faker().city()
+        self._hoy = datetime.date.today()
+        # Plantilla de página compartida por todos los documentos
+        self._page_template = PageTemplate(id='main', frames=[Frame(inch, inch, 6.5 * inch, 9 * inch)], onPage=self._crear_encabezado_pie)
         
     def _crear_estilos_personalizados(self):
         """Crea estilos de texto adaptados a documentos formales."""
@@ -40,33 +69,46 @@ class GeneradorDocumentosCol:
         self.styles.add(ParagraphStyle(name='RightDate', parent=self.styles['Normal'], alignment=TA_RIGHT, spaceAfter=20))
         self.styles.add(ParagraphStyle(name='Signature', parent=self.styles['Normal'], spaceBefore=40))
 
-    def _get_fecha_reciente(self):
-        """Genera una fecha del último mes."""
-        end_date = datetime.date.today()
+    def _get_fecha_reciente(self, end_date=None):
+        """Genera una fecha del último mes (por defecto, respecto a la fecha de creación del generador)."""
+        end_date = end_date or self._hoy
         start_date = end_date - datetime.timedelta(days=30)
         random_date = fake.date_between(start_date=start_date, end_date=end_date)
-        meses = ["enero", "febrero", "marzo", "abril", "mayo", "junio", "julio", "agosto", "septiembre", "octubre", "noviembre", "diciembre"]
-        return f"{random_date.day} de {meses[random_date.month - 1]} de {random_date.year}"
+        return f"{random_date.day} de {MESES_ES[random_date.month - 1]} de {random_date.year}"
 
     def _crear_encabezado_pie(self, canvas, doc):
         """Función callback para encabezado y pie de página en cada hoja."""
         canvas.saveState()
         # Encabezado
         canvas.setFont('Helvetica-Bold', 10)
-        canvas.drawString(inch, 10.5 * inch, "ENTIDAD FICTICIA DE COLOMBIA S.A.S.")
+        canvas.drawString(self.HEADER_X, self.HEADER_TITULO_Y, "ENTIDAD FICTICIA DE COLOMBIA S.A.S.")
         canvas.setFont('Helvetica', 8)
-        canvas.drawString(inch, 10.35 * inch, f"NIT: {generar_nit()} - {fake.city()}")
-        canvas.line(inch, 10.3 * inch, 7.5 * inch, 10.3 * inch)
+        canvas.drawString(self.HEADER_X, self.HEADER_NIT_Y, f"NIT: {self._header_nit} - {self._header_city}")
+        canvas.line(self.HEADER_X, self.HEADER_LINEA_Y, self.MARGEN_DERECHO_X, self.HEADER_LINEA_Y)
         
         # Pie de página
         canvas.setFont('Helvetica', 8)
-        canvas.drawString(inch, 0.75 * inch, "Documento generado para fines de prueba y clasificación automática.")
-        canvas.drawRightString(7.5 * inch, 0.75 * inch, f"Página {doc.page}")
+        canvas.drawString(self.HEADER_X, self.FOOTER_Y, "Documento generado para fines de prueba y clasificación automática.")
+        canvas.drawRightString(self.MARGEN_DERECHO_X, self.FOOTER_Y, f"Página {doc.page}")
         canvas.restoreState()
 
+    def _parrafo_fijo(self, texto, estilo):
+        """Retorna un Paragraph de texto invariable; el marcado se parsea una sola vez por proceso."""
+        clave = (texto, estilo)
+        if clave not in _PARRAFOS_FIJOS:
+            _PARRAFOS_FIJOS[clave] = Paragraph(texto, self.styles[estilo])
+        # Copia superficial: comparte el texto parseado pero no el estado de maquetación entre documentos
+        return copy.copy(_PARRAFOS_FIJOS[clave])
+
+    def _new_doc(self, filepath):
+        """Crea un documento que reutiliza la plantilla de página ya construida."""
+        doc = BaseDocTemplate(filepath, pagesize=LETTER)
+        doc.addPageTemplates([self._page_template])
+        return doc
+
     def generar_queja(self, filepath, consecutivo):
         """Genera una PQR basada en la Ley 1480 de 2011."""
-        doc = SimpleDocTemplate(filepath, pagesize=LETTER)
+        doc = self._new_doc(filepath)
         story = []
         
         # Datos variables
@@ -83,35 +125,34 @@ class GeneradorDocumentosCol:
         story.append(Spacer(1, 12))
         
         cuerpo = [
-            f"Yo, <b>{nombre_cliente}</b>, identificado con Cédula de Ciudadanía No. {fake.random_int(10000000, 99999999)}, "
-            f"actuando en calidad de consumidor, presento formalmente este reclamo por: {motivo}.",
+            Paragraph(f"Yo, <b>{nombre_cliente}</b>, identificado con Cédula de Ciudadanía No. {fake.random_int(10000000, 99999999)}, "
+                      f"actuando en calidad de consumidor, presento formalmente este reclamo por: {motivo}.", self.styles['Justify']),
             
-            "<b>HECHOS:</b>",
-            f"El día {fake.date_this_year()}, adquirí un servicio/producto en sus instalaciones. "
-            f"Sin embargo, {fake.sentence(nb_words=20)} El producto presenta fallas reiteradas que impiden su uso normal.",
+            self._parrafo_fijo("<b>HECHOS:</b>", 'Justify'),
+            Paragraph(f"El día {fake.date_this_year()}, adquirí un servicio/producto en sus instalaciones. "
+                      f"Sin embargo, {fake.sentence(nb_words=20)} El producto presenta fallas reiteradas que impiden su uso normal.", self.styles['Justify']),
             
-            "<b>PRETENSIONES:</b>",
-            "Solicito la efectividad de la garantía legal, procediendo con la reparación, cambio del bien o devolución del dinero, "
-            "según lo estipulado en el Artículo 7 y siguientes del Estatuto del Consumidor.",
+            self._parrafo_fijo("<b>PRETENSIONES:</b>", 'Justify'),
+            self._parrafo_fijo("Solicito la efectividad de la garantía legal, procediendo con la reparación, cambio del bien o devolución del dinero, "
+                               "según lo estipulado en el Artículo 7 y siguientes del Estatuto del Consumidor.", 'Justify'),
             
-            "<b>FUNDAMENTO LEGAL:</b>",
-            "Invoco la Ley 1480 de 2011 (Estatuto del Consumidor), Artículos 3 (Derechos), 7 (Garantía Legal) y 23 (Información).",
+            self._parrafo_fijo("<b>FUNDAMENTO LEGAL:</b>", 'Justify'),
+            self._parrafo_fijo("Invoco la Ley 1480 de 2011 (Estatuto del Consumidor), Artículos 3 (Derechos), 7 (Garantía Legal) y 23 (Información).", 'Justify'),
             
-            "Quedo atento a su respuesta dentro del término legal de quince (15) días hábiles."
+            self._parrafo_fijo("Quedo atento a su respuesta dentro del término legal de quince (15) días hábiles.", 'Justify')
         ]
         
-        for parrafo in cuerpo:
-            story.append(Paragraph(parrafo, self.styles['Justify']))
+        story.extend(cuerpo)
         
-        story.append(Paragraph("Cordialmente,", self.styles['Signature']))
+        story.append(self._parrafo_fijo("Cordialmente,", 'Signature'))
         story.append(Spacer(1, 30))
         story.append(Paragraph(f"__________________________<br/>{nombre_cliente}", self.styles['Normal']))
         
-        doc.build(story, onFirstPage=self._crear_encabezado_pie, onLaterPages=self._crear_encabezado_pie)
+        doc.build(story)
 
     def generar_contrato(self, filepath, consecutivo):
         """Genera un contrato comercial o civil."""
-        doc = SimpleDocTemplate(filepath, pagesize=LETTER)
+        doc = self._new_doc(filepath)
         story = []
         
         tipo_contrato = random.choice(["PRESTACIÓN DE SERVICIOS PROFESIONALES", "ARRENDAMIENTO COMERCIAL", "SUMINISTRO", "CONFIDENCIALIDAD", "COMPRAVENTA"])
@@ -129,15 +170,15 @@ class GeneradorDocumentosCol:
         story.append(Paragraph(intro, self.styles['Justify']))
         
         clausulas = [
-            f"<b>PRIMERA - OBJETO:</b> El Contratista se obliga de manera independiente a {fake.bs()} en favor del Contratante.",
-            f"<b>SEGUNDA - VALOR Y FORMA DE PAGO:</b> El valor del presente contrato es de {valor} M/CTE, pagaderos previa presentación de cuenta de cobro y soporte de pago a seguridad social (Ley 797 de 2003).",
-            f"<b>TERCERA - DURACIÓN:</b> El plazo de ejecución será de {random.randint(1, 12)} meses contados a partir de la firma del acta de inicio.",
-            "<b>CUARTA - DOMICILIO CONTRACTUAL:</b> Para todos los efectos legales, el domicilio contractual será la ciudad de Bogotá D.C.",
-            "<b>QUINTA - MÉRITO EJECUTIVO:</b> El presente documento presta mérito ejecutivo en caso de incumplimiento de las obligaciones dinerarias aquí pactadas."
+            Paragraph(f"<b>PRIMERA - OBJETO:</b> El Contratista se obliga de manera independiente a {fake.bs()} en favor del Contratante.", self.styles['Justify']),
+            Paragraph(f"<b>SEGUNDA - VALOR Y FORMA DE PAGO:</b> El valor del presente contrato es de {valor} M/CTE, pagaderos previa presentación de cuenta de cobro y soporte de pago a seguridad social (Ley 797 de 2003).", self.styles['Justify']),
+            Paragraph(f"<b>TERCERA - DURACIÓN:</b> El plazo de ejecución será de {random.randint(1, 12)} meses contados a partir de la firma del acta de inicio.", self.styles['Justify']),
+            self._parrafo_fijo("<b>CUARTA - DOMICILIO CONTRACTUAL:</b> Para todos los efectos legales, el domicilio contractual será la ciudad de Bogotá D.C.", 'Justify'),
+            self._parrafo_fijo("<b>QUINTA - MÉRITO EJECUTIVO:</b> El presente documento presta mérito ejecutivo en caso de incumplimiento de las obligaciones dinerarias aquí pactadas.", 'Justify')
         ]
         
         for clausula in clausulas:
-            story.append(Paragraph(clausula, self.styles['Justify']))
+            story.append(clausula)
             story.append(Spacer(1, 6))
 
         story.append(Spacer(1, 40))
@@ -145,20 +186,20 @@ class GeneradorDocumentosCol:
         # Tabla de firmas
         data = [[f"__________________\n{contratante}\nNIT: {generar_nit()}", f"__________________\n{contratista}\nCC: {fake.ean8()}"]]
         t = Table(data)
-        t.setStyle(TableStyle([('ALIGN', (0,0), (-1,-1), 'CENTER'), ('VALIGN', (0,0), (-1,-1), 'BOTTOM')]))
+        t.setStyle(self._FIRMA_STYLE)
         story.append(t)
         
-        doc.build(story, onFirstPage=self._crear_encabezado_pie, onLaterPages=self._crear_encabezado_pie)
+        doc.build(story)
 
     def generar_resolucion(self, filepath, consecutivo):
         """Genera un acto administrativo."""
-        doc = SimpleDocTemplate(filepath, pagesize=LETTER)
+        doc = self._new_doc(filepath)
         story = []
         
         director = fake.name()
         entidad = "LA DIRECCIÓN DE GESTIÓN HUMANA Y PROCESOS"
         
-        story.append(Paragraph(f"RESOLUCIÓN NÚMERO {consecutivo} DE {datetime.date.today().year}", self.styles['CenterTitle']))
+        story.append(Paragraph(f"RESOLUCIÓN NÚMERO {consecutivo} DE {self._hoy.year}", self.styles['CenterTitle']))
         story.append(Paragraph(f"({self._get_fecha_reciente()})", self.styles['CenterTitle']))
         story.append(Spacer(1, 12))
         
@@ -167,39 +208,38 @@ class GeneradorDocumentosCol:
         
         story.append(Paragraph(f"El Director de {entidad}, en uso de sus facultades legales y estatutarias, y", self.styles['Justify']))
         
-        story.append(Paragraph("<b>CONSIDERANDO:</b>", self.styles['Normal']))
+        story.append(self._parrafo_fijo("<b>CONSIDERANDO:</b>", 'Normal'))
         considerandos = [
-            f"Que la entidad tiene como misión {fake.bs()}.",
-            f"Que mediante acta del {fake.date_this_year()}, el comité evaluador recomendó la adopción de nuevas medidas.",
-            "Que es necesario ajustar los procedimientos internos conforme al Código de Procedimiento Administrativo y de lo Contencioso Administrativo (Ley 1437 de 2011)."
+            Paragraph(f"Que la entidad tiene como misión {fake.bs()}.", self.styles['Justify']),
+            Paragraph(f"Que mediante acta del {fake.date_this_year()}, el comité evaluador recomendó la adopción de nuevas medidas.", self.styles['Justify']),
+            self._parrafo_fijo("Que es necesario ajustar los procedimientos internos conforme al Código de Procedimiento Administrativo y de lo Contencioso Administrativo (Ley 1437 de 2011).", 'Justify')
         ]
-        for c in considerandos:
-            story.append(Paragraph(c, self.styles['Justify']))
+        story.extend(considerandos)
         
         story.append(Spacer(1, 12))
-        story.append(Paragraph("<b>RESUELVE:</b>", self.styles['CenterTitle']))
+        story.append(self._parrafo_fijo("<b>RESUELVE:</b>", 'CenterTitle'))
         
         articulos = [
-            f"<b>ARTÍCULO PRIMERO:</b> ADOPTAR el manual técnico de {fake.job()} para todos los funcionarios.",
-            f"<b>ARTÍCULO SEGUNDO:</b> DESIGNAR a {fake.name()} como supervisor del cumplimiento de esta disposición.",
-            "<b>ARTÍCULO TERCERO:</b> Contra la presente resolución proceden los recursos de reposición y apelación dentro de los diez (10) días siguientes a su notificación, conforme al artículo 76 del CPACA.",
-            "<b>ARTÍCULO CUARTO:</b> La presente resolución rige a partir de la fecha de su expedición."
+            Paragraph(f"<b>ARTÍCULO PRIMERO:</b> ADOPTAR el manual técnico de {fake.job()} para todos los funcionarios.", self.styles['Justify']),
+            Paragraph(f"<b>ARTÍCULO SEGUNDO:</b> DESIGNAR a {fake.name()} como supervisor del cumplimiento de esta disposición.", self.styles['Justify']),
+            self._parrafo_fijo("<b>ARTÍCULO TERCERO:</b> Contra la presente resolución proceden los recursos de reposición y apelación dentro de los diez (10) días siguientes a su notificación, conforme al artículo 76 del CPACA.", 'Justify'),
+            self._parrafo_fijo("<b>ARTÍCULO CUARTO:</b> La presente resolución rige a partir de la fecha de su expedición.", 'Justify')
         ]
         
         for art in articulos:
-            story.append(Paragraph(art, self.styles['Justify']))
+            story.append(art)
             story.append(Spacer(1, 6))
 
         story.append(Spacer(1, 20))
-        story.append(Paragraph("PUBLÍQUESE, NOTIFÍQUESE Y CÚMPLASE", self.styles['CenterTitle']))
+        story.append(self._parrafo_fijo("PUBLÍQUESE, NOTIFÍQUESE Y CÚMPLASE", 'CenterTitle'))
         story.append(Spacer(1, 30))
         story.append(Paragraph(f"__________________________<br/>{director}<br/>Director General", self.styles['Normal']))
         
-        doc.build(story, onFirstPage=self._crear_encabezado_pie, onLaterPages=self._crear_encabezado_pie)
+        doc.build(story)
 
     def generar_informe(self, filepath, consecutivo):
         """Genera un informe técnico basado en NTC."""
-        doc = SimpleDocTemplate(filepath, pagesize=LETTER)
+        doc = self._new_doc(filepath)
         story = []
         
         titulo_proyecto = fake.bs().upper()
@@ -216,7 +256,7 @@ class GeneradorDocumentosCol:
         ]
         
         t = Table(datos, colWidths=[100, 300])
-        t.setStyle(TableStyle([('FONTNAME', (0,0), (0,-1), 'Helvetica-Bold'), ('ALIGN', (0,0), (-1,-1), 'LEFT')]))
+        t.setStyle(self._HEADER_TABLE_STYLE)
         story.append(t)
         story.append(Spacer(1, 20))
         
@@ -228,18 +268,18 @@ class GeneradorDocumentosCol:
         ]
         
         for titulo, contenido in secciones:
-            story.append(Paragraph(f"<b>{titulo}</b>", self.styles['Heading3']))
+            story.append(self._parrafo_fijo(f"<b>{titulo}</b>", 'Heading3'))
             story.append(Paragraph(contenido, self.styles['Justify']))
             story.append(Spacer(1, 10))
             
-        doc.build(story, onFirstPage=self._crear_encabezado_pie, onLaterPages=self._crear_encabezado_pie)
+        doc.build(story)
 
     def generar_comunicacion(self, filepath, consecutivo):
         """Genera un memorando o comunicación interna."""
-        doc = SimpleDocTemplate(filepath, pagesize=LETTER)
+        doc = self._new_doc(filepath)
         story = []
         
-        story.append(Paragraph("MEMORANDO INTERNO", self.styles['CenterTitle']))
+        story.append(self._parrafo_fijo("MEMORANDO INTERNO", 'CenterTitle'))
         story.append(Spacer(1, 20))
         
         remitente = fake.name()
@@ -256,71 +296,82 @@ class GeneradorDocumentosCol:
         ]
         
         t = Table(header_data, colWidths=[80, 400])
-        t.setStyle(TableStyle([('FONTNAME', (0,0), (0,-1), 'Helvetica-Bold'), ('ALIGN', (0,0), (-1,-1), 'LEFT')]))
+        t.setStyle(self._HEADER_TABLE_STYLE)
         story.append(t)
         story.append(Spacer(1, 12))
-        story.append(Paragraph("_" * 70, self.styles['Normal']))
+        story.append(self._parrafo_fijo("_" * 70, 'Normal'))
         story.append(Spacer(1, 20))
         
         cuerpo = [
-            f"Cordial saludo estimado(a) {destinatario.split()[0]},",
-            f"Por medio de la presente se informa que, siguiendo los lineamientos del manual de procedimientos internos, se ha decidido implementar {fake.bs()}.",
-            f"Es fundamental que su equipo de trabajo tenga conocimiento de esta directriz antes del cierre del mes. Se adjunta la documentación pertinente.",
-            "Agradezco su gestión y pronta respuesta."
+            Paragraph(f"Cordial saludo estimado(a) {destinatario.split()[0]},", self.styles['Justify']),
+            Paragraph(f"Por medio de la presente se informa que, siguiendo los lineamientos del manual de procedimientos internos, se ha decidido implementar {fake.bs()}.", self.styles['Justify']),
+            self._parrafo_fijo("Es fundamental que su equipo de trabajo tenga conocimiento de esta directriz antes del cierre del mes. Se adjunta la documentación pertinente.", 'Justify'),
+            self._parrafo_fijo("Agradezco su gestión y pronta respuesta.", 'Justify')
         ]
         
         for p in cuerpo:
-            story.append(Paragraph(p, self.styles['Justify']))
+            story.append(p)
             story.append(Spacer(1, 8))
             
         story.append(Spacer(1, 20))
-        story.append(Paragraph("Atentamente,", self.styles['Normal']))
+        story.append(self._parrafo_fijo("Atentamente,", 'Normal'))
         story.append(Spacer(1, 30))
         story.append(Paragraph(remitente, self.styles['Normal']))
         
-        doc.build(story, onFirstPage=self._crear_encabezado_pie, onLaterPages=self._crear_encabezado_pie)
+        doc.build(story)
 
     def ejecutar(self):
-        """Orquesta la creación de todos los documentos."""
+        """Orquesta la creación de todos los documentos (en paralelo, un proceso por CPU)."""
         print(f"Iniciando generación de documentos en: {BASE_DIR}")
         
         if not os.path.exists(BASE_DIR):
             os.makedirs(BASE_DIR)
             
-        total_creados = 0
-        
+        # Las carpetas se crean antes de repartir el trabajo entre procesos
+        tareas = []
         for carpeta_clave, info in TIPOS_DOCS.items():
             path_carpeta = os.path.join(BASE_DIR, carpeta_clave)
             if not os.path.exists(path_carpeta):
                 os.makedirs(path_carpeta)
-                
-            print(f"--- Generando {info['nombre']} ---")
-            
             for i in range(1, 6):
-                consecutivo = f"{info['prefijo']}-{str(i).zfill(3)}"
-                filename = f"{consecutivo}_{info['nombre'].replace(' ', '_')}.pdf"
-                filepath = os.path.join(path_carpeta, filename)
-                
-                try:
-                    if carpeta_clave == "quejas_reclamos":
-                        self.generar_queja(filepath, consecutivo)
-                    elif carpeta_clave == "contratos":
-                        self.generar_contrato(filepath, consecutivo)
-                    elif carpeta_clave == "resoluciones_administrativas":
-                        self.generar_resolucion(filepath, consecutivo)
-                    elif carpeta_clave == "informes_tecnicos":
-                        self.generar_informe(filepath, consecutivo)
-                    elif carpeta_clave == "comunicaciones_internas":
-                        self.generar_comunicacion(filepath, consecutivo)
-                    
+                tareas.append((carpeta_clave, info, i))
+        
+        total_creados = 0
+        nombre_actual = None
+        
+        with ProcessPoolExecutor(initializer=_inicializar_proceso) as ex:
+            resultados = ex.map(_render_one, *zip(*tareas))
+            for (carpeta_clave, info, i), (filename, error) in zip(tareas, resultados):
+                if info['nombre'] != nombre_actual:
+                    nombre_actual = info['nombre']
+                    print(f"--- Generando {nombre_actual} ---")
+                if error is None:
                     print(f"  [OK] Generado: {filename}")
                     total_creados += 1
-                except Exception as e:
-                    print(f"  [ERROR] Falló {filename}: {str(e)}")
+                else:
+                    print(f"  [ERROR] Falló {filename}: {error}")
                     
         print(f"\nProceso finalizado. Total documentos: {total_creados}")
         print(f"Ubicación: {os.path.abspath(BASE_DIR)}")
 
+def _inicializar_proceso():
+    """Re-siembra los generadores aleatorios para que cada proceso produzca datos distintos."""
+    random.seed()
+    Faker.seed()
+
+def _render_one(carpeta_clave, info, i):
+    """Genera un único documento. Se ejecuta en un proceso del pool y retorna (filename, error)."""
+    consecutivo = f"{info['prefijo']}-{str(i).zfill(3)}"
+    filename = f"{consecutivo}_{info['nombre'].replace(' ', '_')}.pdf"
+    filepath = os.path.join(BASE_DIR, carpeta_clave, filename)
+    
+    try:
+        generador = GeneradorDocumentosCol()
+        getattr(generador, info["metodo"])(filepath, consecutivo)
+        return filename, None
+    except Exception as e:
+        return filename, str(e)
+
 if __name__ == "__main__":
     generador = GeneradorDocumentosCol()
     generador.ejecutar()
\ No newline at end of file
@@ -5,21 +5,36 @@ import re
 import json
 import cv2
 import numpy as np
-import glob
 import base64
-from PIL import Image, ImageEnhance
+import unicodedata
+import httpx
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
 from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, Alignment, Border, Side, PatternFill, NamedStyle
 from deskew import determine_skew
 from openai import OpenAI
 from typing import Dict, Any, Union
 
 # --- CONFIGURACIÓN GLOBAL ---
 MODEL_NAME = "llama3.2-vision" 
-DPI = 150  # 150 DPI es el sweet spot para OCR/Visión sin generar payloads gigantes
+DPI = 150  # 150 DPI es el sweet spot para OCR/Visión sin generar payloads gigantes (valor máximo)
+TARGET_PX = int(os.getenv('CLASSIFY_TARGET_PX', 1500))  # Píxeles objetivo en el lado largo de la página
+JPEG_QUALITY = 80  # Calidad JPEG del render enviado al modelo (escala de grises)
+TEXT_THRESHOLD_DIGITAL = 200  # Mínimo de caracteres de texto para considerar el PDF nativo digital
 OLLAMA_URL = os.getenv('OLLAMA_HOST', 'http://host.docker.internal:11434/v1')
+CLASSIFY_WORKERS = int(os.getenv('CLASSIFY_WORKERS', 4))  # Peticiones simultáneas a Ollama
 
-client = OpenAI(base_url=OLLAMA_URL, api_key='ollama')
+# Un único pool de conexiones keep-alive compartido por todos los hilos de clasificación
+client = OpenAI(
+    base_url=OLLAMA_URL,
+    api_key='ollama',
+    http_client=httpx.Client(
+        limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+        timeout=120.0,
+    ),
+)
 
 # --- DEFINICIONES DE NEGOCIO ---
 # Se definen aquí para fácil mantenimiento. Serán inyectadas dinámicamente en el prompt.
@@ -31,25 +46,81 @@ DEFINICIONES_CATEGORIAS = """
 5. COMUNICACION_INTERNA: Memorandos o circulares. Palabras clave: "Memorando", "Circular", "Para:", "De:", "Asunto:", "Cordial saludo".
 """
 
-# Lista auxiliar para validación rápida post-inferencia
-CATEGORIAS_VALIDAS = ["QUEJA_RECLAMO", "CONTRATO", "RESOLUCION_ADMINISTRATIVA", 
-                      "INFORME_TECNICO", "COMUNICACION_INTERNA"]
+# Conjunto auxiliar para validación rápida post-inferencia
+CATEGORIAS_VALIDAS = frozenset(["QUEJA_RECLAMO", "CONTRATO", "RESOLUCION_ADMINISTRATIVA", 
+                                "INFORME_TECNICO", "COMUNICACION_INTERNA"])
+
+# Palabras clave (minúsculas y sin tildes) para la clasificación rápida sin LLM
+_KEYWORDS = {
+    "QUEJA_RECLAMO": {"reclamo", "peticion", "solicito", "inconformidad", "derecho de peticion",
+                      "estatuto del consumidor", "pretensiones", "garantia legal"},
+    "CONTRATO": {"contratante", "contratista", "clausulas", "objeto del contrato", "prestacion de servicios",
+                 "forma de pago", "merito ejecutivo", "domicilio contractual"},
+    "RESOLUCION_ADMINISTRATIVA": {"resolucion numero", "resolucion no", "resuelve", "considerando",
+                                  "articulo primero", "notifiquese", "cumplase"},
+    "INFORME_TECNICO": {"informe tecnico", "informe de gestion", "diagnostico", "objetivo", "alcance",
+                        "metodologia", "hallazgos", "conclusiones"},
+    "COMUNICACION_INTERNA": {"memorando", "circular", "para:", "de:", "asunto:", "cordial saludo"},
+}
+FAST_MIN_HITS = 3    # Mínimo de palabras clave distintas de la categoría ganadora
+FAST_MIN_MARGIN = 2  # Ventaja mínima sobre la segunda categoría
+
+# Partes invariantes del prompt: el texto del documento se inserta entre ambas en cada llamada
+_PROMPT_PREFIX = f"""Eres un clasificador documental experto para una entidad pública.
+    
+    TU OBJETIVO: Clasificar el documento basándote en la IMAGEN visual y el TEXTO extraído.
+    
+    DEFINICIONES DE CATEGORÍAS (Criterios estrictos):
+    {DEFINICIONES_CATEGORIAS}
+
+    TEXTO EXTRAÍDO DEL DOCUMENTO:
+    \""""
+
+_PROMPT_SUFFIX = """..."
+
+    INSTRUCCIONES DE SALIDA:
+    1. Analiza si el documento cumple con las palabras clave visuales o textuales definidas.
+    2. Si no encaja claramente en ninguna, usa "REVISION_MANUAL".
+    3. 'score' debe representar tu nivel de certeza (0.0 a 1.0).
+    
+    RESPONDE ÚNICAMENTE CON ESTE FORMATO JSON RAW (Sin Markdown, sin explicaciones previas):
+    {"categoria": "NOMBRE_CATEGORIA", "score": <float_entre_0_y_1>, "evidencia": "breve justificación"}"""
+
+# Expresión regular de limpieza de bloques markdown en la respuesta (compilada una sola vez)
+_RE_MD = re.compile(r'```(?:json)?|```')
 
 # --- FUNCIONES DE UTILIDAD (IMAGEN) ---
 
-def encode_image_to_base64(image: Image.Image) -> str:
+def encode_image_to_base64(jpeg_bytes: bytes) -> str:
     """
-    Convierte un objeto PIL Image a una cadena base64 UTF-8.
+    Convierte los bytes de una imagen JPEG a una cadena base64.
     
     Args:
-        image (Image.Image): Imagen PIL a convertir.
+        jpeg_bytes (bytes): Imagen ya codificada en JPEG.
         
     Returns:
         str: Cadena codificada en base64 lista para enviar a la API.
     """
+    return base64.b64encode(jpeg_bytes).decode('ascii')
+
+def image_to_jpeg_bytes(image: Image.Image) -> bytes:
+    """
+    Codifica un objeto PIL Image como JPEG. Solo se usa en la ruta de documentos escaneados,
+    donde la imagen pasa por preprocess_image antes de enviarse al modelo.
+    
+    Args:
+        image (Image.Image): Imagen PIL a convertir.
+        
+    Returns:
+        bytes: Imagen codificada en JPEG.
+    """
     buffered = io.BytesIO()
-    image.save(buffered, format="JPEG")
-    return base64.b64encode(buffered.getvalue()).decode('utf-8')
+    image.save(buffered, format="JPEG", quality=JPEG_QUALITY)
+    return buffered.getvalue()
+
+# Tabla de consulta (LUT) para el ajuste de contraste 1.5 alrededor del gris medio:
+# y = clip((x - 127) * 1.5 + 127, 0, 255). Se aplica con Image.point en una sola pasada.
+_CONTRAST_LUT_15 = tuple(max(0, min(255, int((i - 127) * 1.5 + 127))) for i in range(256))
 
 def preprocess_image(image: Image.Image) -> Image.Image:
     """
@@ -62,68 +133,90 @@ def preprocess_image(image: Image.Image) -> Image.Image:
         image (Image.Image): Imagen original extraída del PDF.
 
     Returns:
-        Image.Image: Imagen procesada (corregida y con contraste ajustado).
+        Image.Image: Imagen procesada en escala de grises (corregida y con contraste ajustado).
     """
     try:
-        # Conversión para OpenCV
-        open_cv_image = np.array(image.convert('RGB'))[:, :, ::-1].copy()
-        grayscale = cv2.cvtColor(open_cv_image, cv2.COLOR_BGR2GRAY)
+        # Se trabaja en escala de grises: basta para la legibilidad y mueve 1/3 de los datos
+        grayscale = np.asarray(image.convert('L'))
         
         # Detección de ángulo de inclinación
         angle = determine_skew(grayscale)
         
         # Aplicar rotación solo si la inclinación es significativa (> 0.5 grados)
         if angle and abs(angle) > 0.5:
-            (h, w) = open_cv_image.shape[:2]
+            (h, w) = grayscale.shape[:2]
             M = cv2.getRotationMatrix2D((w//2, h//2), angle, 1.0)
-            rotated = cv2.warpAffine(open_cv_image, M, (w, h), flags=cv2.INTER_CUBIC, borderValue=(255, 255, 255))
-            corrected_image = Image.fromarray(cv2.cvtColor(rotated, cv2.COLOR_BGR2RGB))
+            rotated = cv2.warpAffine(grayscale, M, (w, h), flags=cv2.INTER_LINEAR, borderValue=255)
+            corrected_image = Image.fromarray(rotated)
         else:
-            corrected_image = image
+            corrected_image = Image.fromarray(grayscale)
         
         # Ajuste de contraste (1.5 es más seguro que 1.8 para evitar saturación en firmas)
-        return ImageEnhance.Contrast(corrected_image).enhance(1.5)
+        return corrected_image.point(_CONTRAST_LUT_15)
     except Exception as e:
         print(f"Advertencia: Falló el preprocesamiento de imagen ({e}). Usando original.")
         return image
 
+def _pick_dpi(page: fitz.Page) -> int:
+    """
+    Calcula el DPI de renderizado para que el lado largo de la página quede en ~TARGET_PX píxeles,
+    sin superar DPI. Así una página tamaño tabloide no genera una imagen gigante.
+    """
+    return min(DPI, int(TARGET_PX / max(page.rect.width, page.rect.height) * 72))
+
+def _pick_matrix(page: fitz.Page) -> fitz.Matrix:
+    """Matriz de escala equivalente a _pick_dpi(page)."""
+    dpi = _pick_dpi(page)
+    return fitz.Matrix(dpi / 72, dpi / 72)
+
 # --- LÓGICA CORE DE CLASIFICACIÓN ---
 
-def classify_document_hybrid(image: Image.Image, text_context: str) -> Dict[str, Union[str, float]]:
+def _fast_classify(text: str) -> Union[Dict[str, Union[str, float]], None]:
+    """
+    Clasificación rápida por palabras clave, sin invocar el modelo de visión.
+
+    Args:
+        text (str): Texto extraído de la primera página.
+
+    Returns:
+        dict | None: Resultado con keys {'categoria', 'score', 'evidencia'} si una categoría domina
+        con claridad (FAST_MIN_HITS y FAST_MIN_MARGIN), o None para continuar con el LLM.
+    """
+    # Minúsculas y sin tildes, una sola vez para todas las búsquedas
+    normalizado = unicodedata.normalize('NFKD', text.lower())
+    normalizado = normalizado.encode('ascii', 'ignore').decode('ascii')
+
+    hits = {cat: [kw for kw in kws if kw in normalizado] for cat, kws in _KEYWORDS.items()}
+    ranking = sorted(hits, key=lambda cat: len(hits[cat]), reverse=True)
+    top, second = ranking[0], ranking[1]
+
+    if len(hits[top]) >= FAST_MIN_HITS and len(hits[top]) - len(hits[second]) >= FAST_MIN_MARGIN:
+        return {
+            "categoria": top,
+            "score": 0.85,
+            "evidencia": "Palabras clave: " + ", ".join(sorted(hits[top]))
+        }
+    return None
+
+def classify_document_hybrid(jpeg_bytes: bytes, text_context: str) -> Dict[str, Union[str, float]]:
     """
     Clasifica un documento utilizando un enfoque híbrido (Visión + Texto).
     Utiliza Llama 3.2 Vision a través de Ollama.
 
     Args:
-        image (Image.Image): Imagen de la primera página del documento.
+        jpeg_bytes (bytes): Imagen JPEG de la primera página del documento.
         text_context (str): Texto crudo extraído del PDF (OCR o capa de texto).
 
     Returns:
         dict: Diccionario con keys {'categoria', 'score', 'evidencia'}.
     """
-    base64_image = encode_image_to_base64(image)
+    base64_image = encode_image_to_base64(jpeg_bytes)
     
     # Limpieza de texto: eliminar saltos de línea excesivos para optimizar tokens
-    text_snippet = re.sub(r'\s+', ' ', text_context).strip()[:2000].replace('"', "'")
+    text_snippet = ' '.join(text_context.split())[:2000].replace('"', "'")
 
-    # Prompt Ingeniería: Inyectamos las definiciones y evitamos sesgo en el score
-    prompt_sistema = f"""Eres un clasificador documental experto para una entidad pública.
-    
-    TU OBJETIVO: Clasificar el documento basándote en la IMAGEN visual y el TEXTO extraído.
-    
-    DEFINICIONES DE CATEGORÍAS (Criterios estrictos):
-    {DEFINICIONES_CATEGORIAS}
-
-    TEXTO EXTRAÍDO DEL DOCUMENTO:
-    "{text_snippet}..."
-
-    INSTRUCCIONES DE SALIDA:
-    1. Analiza si el documento cumple con las palabras clave visuales o textuales definidas.
-    2. Si no encaja claramente en ninguna, usa "REVISION_MANUAL".
-    3. 'score' debe representar tu nivel de certeza (0.0 a 1.0).
-    
-    RESPONDE ÚNICAMENTE CON ESTE FORMATO JSON RAW (Sin Markdown, sin explicaciones previas):
-    {{"categoria": "NOMBRE_CATEGORIA", "score": <float_entre_0_y_1>, "evidencia": "breve justificación"}}"""
+    # Prompt Ingeniería: solo el fragmento de texto varía; el resto se arma una vez a nivel de módulo
+    prompt_sistema = _PROMPT_PREFIX + text_snippet + _PROMPT_SUFFIX
 
     try:
         response = client.chat.completions.create(
@@ -148,10 +241,10 @@ def classify_document_hybrid(image: Image.Image, text_context: str) -> Dict[str,
         
         # --- Limpieza Robusta de JSON ---
         # 1. Eliminar bloques de código markdown (```json ... ```)
-        cleaned = re.sub(r'```(?:json)?|```', '', content).strip()
-        # 2. Aislar el objeto JSON eliminando ruido antes y después de las llaves
-        cleaned = re.sub(r'^[^{]*', '', cleaned)
-        cleaned = re.sub(r'[^}]*$', '', cleaned)
+        cleaned = _RE_MD.sub('', content).strip()
+        # 2. Aislar el objeto JSON: desde la primera '{' hasta la última '}'
+        i, j = cleaned.find('{'), cleaned.rfind('}')
+        cleaned = cleaned[i:j+1] if i != -1 and j != -1 else ''
         
         if cleaned:
             result = json.loads(cleaned)
@@ -193,7 +286,8 @@ def classify_document_hybrid(image: Image.Image, text_context: str) -> Dict[str,
 def process_pdf(input_path: str) -> dict:
     """
     Versión OPTIMIZADA para documentos nativos digitales.
-    Sin deskewing ni filtros de contraste.
+    Sin deskewing ni filtros de contraste, salvo que la página tenga menos de
+    TEXT_THRESHOLD_DIGITAL caracteres de texto (probable escaneo).
     """
     try:
         doc = fitz.open(input_path)
@@ -205,16 +299,29 @@ def process_pdf(input_path: str) -> dict:
         # 1. Extracción de Texto (En PDFs digitales esto es 100% preciso, ¡aprovéchalo!)
         text_content = page.get_text("text") or ""
         
+        # Atajo: si las palabras clave son concluyentes no se renderiza ni se llama al LLM
+        fast_result = _fast_classify(text_content)
+        if fast_result is not None:
+            doc.close()
+            return fast_result
+        
         # 2. Renderizado de Imagen (Directo, sin pre-proceso)
-        # Nota: DPI=150 sigue siendo bueno. Si la letra es muy pequeña en el digital, 
-        # podrías probar DPI=200, pero 150 suele bastar.
-        pix = page.get_pixmap(dpi=DPI)
+        # Nota: el DPI se ajusta al tamaño de la página (máximo DPI=150). Si la letra es muy
+        # pequeña en el digital, se puede subir CLASSIFY_TARGET_PX.
+        # Escala de grises: 1 byte por píxel en lugar de 3, el color no aporta a la clasificación
+        pix = page.get_pixmap(matrix=_pick_matrix(page), colorspace=fitz.csGRAY, alpha=False)
         
-        # Convertimos directamente los bytes a una imagen PIL
-        img = Image.open(io.BytesIO(pix.tobytes()))
+        # Documentos escaneados (poco texto extraíble) sí pasan por el pre-procesamiento visual
+        if len(text_content.strip()) < TEXT_THRESHOLD_DIGITAL:
+            mode = "L" if pix.n == 1 else "RGB"
+            img = Image.frombytes(mode, (pix.width, pix.height), pix.samples)
+            jpeg_bytes = image_to_jpeg_bytes(preprocess_image(img))
+        else:
+            # PyMuPDF codifica el JPEG directamente, sin pasar por PNG ni por PIL
+            jpeg_bytes = pix.tobytes("jpeg", jpg_quality=JPEG_QUALITY)
         
         # 3. Clasificación (Pasamos la imagen limpia)
-        result = classify_document_hybrid(img, text_content)
+        result = classify_document_hybrid(jpeg_bytes, text_content)
         
         doc.close()
         return result
@@ -228,7 +335,7 @@ def main():
     input_folder = "/data" 
     output_excel = "/data/clasificacion_documentos.xlsx"
 
-    pdf_files = glob.glob(os.path.join(input_folder, '*.pdf'))
+    pdf_files = sorted(e.path for e in os.scandir(input_folder) if e.is_file() and e.name.lower().endswith('.pdf'))
     
     if not pdf_files:
         print("No se encontraron PDFs en la carpeta 'data'.")
@@ -236,56 +343,59 @@ def main():
 
     print(f"Iniciando clasificación de {len(pdf_files)} documentos...")
     
-    # Configuración de Excel
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Clasificación de Documentos"
+    # Configuración de Excel (modo write_only: las filas se escriben a disco a medida que se agregan)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Clasificación de Documentos")
     
-    # Estilos de Excel
-    header_font = Font(name='Arial', size=12, bold=True, color='FFFFFF')
-    header_fill = PatternFill(start_color='4472C4', end_color='4472C4', fill_type='solid')
-    header_alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
-    cell_alignment = Alignment(horizontal='left', vertical='center', wrap_text=True)
+    # Estilos de Excel: se registran una sola vez como estilos con nombre y cada celda solo los referencia
     thin_border = Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin'))
+    header_style = NamedStyle(name='encabezado',
+                              font=Font(name='Arial', size=12, bold=True, color='FFFFFF'),
+                              fill=PatternFill(start_color='4472C4', end_color='4472C4', fill_type='solid'),
+                              alignment=Alignment(horizontal='center', vertical='center', wrap_text=True),
+                              border=thin_border)
+    cell_style = NamedStyle(name='celda',
+                            alignment=Alignment(horizontal='left', vertical='center', wrap_text=True),
+                            border=thin_border)
+    wb.add_named_style(header_style)
+    wb.add_named_style(cell_style)
     
-    headers = ["Nombre de Archivo", "Categoría Detectada", "Score", "Justificación"]
-    
-    # Escribir encabezados
-    for col_num, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col_num, value=header)
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = header_alignment
-        cell.border = thin_border
+    def styled_row(values, style):
+        row = []
+        for value in values:
+            cell = WriteOnlyCell(ws, value=value)
+            cell.style = style
+            row.append(cell)
+        return row
     
-    # Ajuste de columnas
+    # Ajuste de columnas (en modo write_only debe hacerse antes de agregar filas)
     ws.column_dimensions['A'].width = 40
     ws.column_dimensions['B'].width = 32
     ws.column_dimensions['C'].width = 10
     ws.column_dimensions['D'].width = 50
     ws.row_dimensions[1].height = 30
     
-    # Loop de procesamiento
-    row_num = 2
-    for pdf_path in pdf_files:
-        filename = os.path.basename(pdf_path)
-        print(f"\n--- Analizando: {filename} ---")
-        
-        result = process_pdf(pdf_path)
-        
-        cat = result.get("categoria", "ERROR")
-        score = result.get("score", 0.0)
-        evidencia = result.get("evidencia", "")
-        
-        print(f"   -> Resultado: {cat} (Score: {score})")
-        
-        row_data = [filename, cat, score, evidencia]
-        for col_num, value in enumerate(row_data, 1):
-            cell = ws.cell(row=row_num, column=col_num, value=value)
-            cell.alignment = cell_alignment
-            cell.border = thin_border
-        
-        row_num += 1
+    headers = ["Nombre de Archivo", "Categoría Detectada", "Score", "Justificación"]
+    ws.append(styled_row(headers, 'encabezado'))
+    
+    # Clasificación concurrente: cada hilo espera la respuesta HTTP de Ollama.
+    # map() entrega los resultados en el orden de entrada a medida que están listos,
+    # así que el progreso se muestra durante la ejecución y el Excel queda en orden.
+    print(f"Usando {CLASSIFY_WORKERS} hilos de clasificación...")
+    with ThreadPoolExecutor(max_workers=CLASSIFY_WORKERS) as ex:
+        # Escritura secuencial del Excel desde el hilo principal (openpyxl no es thread-safe)
+        for pdf_path, result in zip(pdf_files, ex.map(process_pdf, pdf_files)):
+            filename = os.path.basename(pdf_path)
+            print(f"\n--- Analizando: {filename} ---")
+            
+            cat = result.get("categoria", "ERROR")
+            score = result.get("score", 0.0)
+            evidencia = result.get("evidencia", "")
+            
+            print(f"   -> Resultado: {cat} (Score: {score})")
+            
+            row_data = [filename, cat, score, evidencia]
+            ws.append(styled_row(row_data, 'celda'))
     
     wb.save(output_excel)
     print(f"\nProceso finalizado. Resultados en: {output_excel}")
@@ -22,8 +22,12 @@ Categorías de Clasificación:
 Flujo de Trabajo:
 -----------------
     1. Escanea la carpeta /data buscando archivos PDF
-    2. Extrae texto inteligente de cada PDF (primera página, inicio de segunda, última página)
-    3. Envía el texto al modelo LLM para clasificación
+    2. Extrae texto inteligente de cada PDF (primera página, inicio de segunda, última página),
+       procesando varios PDFs en paralelo (variable de entorno PDF_WORKERS)
+       y clasifica por reglas los que tienen palabras clave inequívocas (sin LLM)
+    3. Envía el texto al modelo LLM para clasificación, con varias peticiones concurrentes
+       (variable de entorno OLLAMA_NUM_PARALLEL), a medida que se extrae: la extracción
+       de los siguientes PDFs se solapa con las llamadas al LLM de los anteriores
     4. Genera un reporte Excel con los resultados
 
 Dependencias:
@@ -31,11 +35,24 @@ Dependencias:
     - fitz (PyMuPDF): Extracción de texto de PDFs
     - openpyxl: Generación de reportes Excel
     - openai: Cliente para comunicación con Ollama (API compatible)
+    - datasketch: MinHash + LSH para la caché semántica
+    - tiktoken: Conteo de tokens para limitar el tamaño del prompt
 
 Configuración Requerida:
 ------------------------
-    - Ollama ejecutándose con el modelo configurado (por defecto: qwen2.5:7b)
+    - Ollama ejecutándose con el modelo configurado (por defecto: qwen2.5:1.5b-instruct-q4_K_M,
+      instalar con `ollama pull qwen2.5:1.5b-instruct-q4_K_M`)
+    - Variable de entorno CLASS_MODEL (opcional): modelo de Ollama a utilizar
     - Variable de entorno OLLAMA_HOST (opcional, default: http://host.docker.internal:11434/v1)
+    - Variable de entorno PDF_WORKERS (opcional, default: núcleos de CPU, máximo 8)
+    - Variable de entorno BATCH_SIZE (opcional, default: 4, máximo 8): documentos por petición
+    - Variable de entorno LLM_CACHE_PATH (opcional, default: /data/.llm_cache): caché de respuestas
+    - Variable de entorno SEMCACHE_PATH (opcional, default: /data/.semcache): caché semántica
+    - Variable de entorno OLLAMA_KEEP_ALIVE (opcional, default: 10m): tiempo que el modelo
+      precargado permanece en memoria
+    - Variable de entorno OLLAMA_NUM_PARALLEL (opcional, default: 4). Para que las peticiones
+      concurrentes se atiendan en paralelo, el servidor Ollama debe iniciarse con el mismo
+      valor: `OLLAMA_NUM_PARALLEL=4 ollama serve`
 
 Uso:
 ----
@@ -50,29 +67,84 @@ Versión: 1.0.0
 """
 
 import os
+import asyncio
+import csv
 import fitz  # PyMuPDF - Biblioteca para manipulación de documentos PDF
 import re
-import json
+import orjson  # Parser JSON implementado en C
 import glob
+import httpx
+import hashlib
+import shelve
+import pickle
+import unicodedata
+from functools import lru_cache
+import tiktoken  # Tokenizador BPE para limitar el prompt por tokens
+from concurrent.futures import ProcessPoolExecutor
+from datasketch import MinHash, MinHashLSH
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
-from openai import OpenAI  # Cliente OpenAI compatible con Ollama
-from typing import Dict, Any, Union
+from openai import AsyncOpenAI  # Cliente OpenAI (asíncrono) compatible con Ollama
+from typing import Callable, Dict, Any, List, Optional, Union
 
 # =============================================================================
 # CONFIGURACIÓN DEL MODELO LLM
 # =============================================================================
 # Configuración para conectar con Ollama (servidor LLM local).
-# Modelos recomendados: qwen2.5:7b, qwen2.5-coder:7b
-# Para instalar un modelo: `ollama pull qwen2.5:7b`
-
-#MODEL_NAME = "qwen2.5:7b"  
-MODEL_NAME = "qwen2.5-coder:7b"  # Modelo de lenguaje a utilizar para clasificación
+# Para clasificar en 5 categorías basta un modelo pequeño y cuantizado: con la salida
+# restringida por esquema (RESPONSE_SCHEMA) acierta casi como uno de 7B y genera varias
+# veces más tokens por segundo.
+# Modelos recomendados: qwen2.5:1.5b-instruct-q4_K_M, qwen2.5:3b-instruct-q4_K_M, qwen2.5:7b
+# Para instalar un modelo (en el host donde corre Ollama): `ollama pull qwen2.5:1.5b-instruct-q4_K_M`
+# Antes de cambiar de modelo, comparar su precisión con evaluar_modelo.py
+
+MODEL_NAME = os.getenv('CLASS_MODEL', 'qwen2.5:1.5b-instruct-q4_K_M')  # Modelo de lenguaje a utilizar para clasificación
 OLLAMA_URL = os.getenv('OLLAMA_HOST', 'http://host.docker.internal:11434/v1')  # URL del servidor Ollama
 
-# Cliente OpenAI configurado para comunicarse con Ollama
+# Número de procesos que extraen texto de los PDFs en paralelo (PyMuPDF es seguro entre procesos)
+PDF_WORKERS = int(os.getenv('PDF_WORKERS', min(os.cpu_count() or 1, 8)))
+
+# Máximo de peticiones simultáneas al LLM. Debe coincidir con OLLAMA_NUM_PARALLEL
+# configurado en el servidor Ollama (las peticiones adicionales quedan en cola del servidor).
+OLLAMA_NUM_PARALLEL = int(os.getenv('OLLAMA_NUM_PARALLEL', '4'))
+
+# Documentos por petición al LLM. Un lote comparte el prefill del prompt del sistema y
+# un único viaje HTTP; se limita a 8 para no acercarse al contexto máximo del modelo.
+BATCH_SIZE = max(1, min(int(os.getenv('BATCH_SIZE', '4')), 8))
+
+MAX_CHARS_PER_TOKEN = 8   # Margen del precorte por caracteres (el español promedia ~4)
+AVG_CHARS_PER_TOKEN = 4   # Recorte por caracteres si el tokenizador no está disponible
+
+# Opciones de extracción de texto de PyMuPDF: las de get_text("text") por defecto, más
+# la unión de palabras cortadas con guion al final de línea (mejora la búsqueda de palabras clave)
+TEXT_FLAGS = fitz.TEXTFLAGS_TEXT | fitz.TEXT_DEHYPHENATE
+
+# Caché en disco de respuestas del LLM (clave: modelo + definiciones + texto del documento)
+LLM_CACHE_PATH = os.getenv('LLM_CACHE_PATH', '/data/.llm_cache')
+
+# Caché semántica (MinHash + LSH) para documentos casi idénticos
+SEMCACHE_PATH = os.getenv('SEMCACHE_PATH', '/data/.semcache')
+SEMCACHE_NUM_PERM = 64       # Permutaciones de la firma MinHash
+SEMCACHE_THRESHOLD = 0.85    # Similitud de Jaccard mínima para considerar dos documentos equivalentes
+SEMCACHE_MIN_SCORE = 0.9     # Solo se reutilizan clasificaciones con alta confianza
+
+# Cliente OpenAI asíncrono configurado para comunicarse con Ollama
 # Nota: Ollama expone una API compatible con OpenAI
-client = OpenAI(base_url=OLLAMA_URL, api_key='ollama')
+# El pool HTTP compartido mantiene abiertas (keep-alive) tantas conexiones como peticiones
+# concurrentes, de modo que ninguna petición paga el establecimiento de una conexión nueva.
+http_client = httpx.AsyncClient(
+    limits=httpx.Limits(max_connections=OLLAMA_NUM_PARALLEL,
+                        max_keepalive_connections=OLLAMA_NUM_PARALLEL),
+    timeout=300.0,  # Un lote de BATCH_SIZE documentos puede tardar varios minutos en CPU
+)
+aclient = AsyncOpenAI(base_url=OLLAMA_URL, api_key='ollama', http_client=http_client)
+
+# URL de la API nativa de Ollama (sin el sufijo /v1 de la API compatible con OpenAI)
+OLLAMA_NATIVE_URL = OLLAMA_URL.rstrip('/').removesuffix('/v1')
+
+# Tiempo que Ollama mantiene el modelo en memoria tras la precarga (warmup_model)
+OLLAMA_KEEP_ALIVE = os.getenv('OLLAMA_KEEP_ALIVE', '10m')
 
 # =============================================================================
 # DEFINICIONES DE NEGOCIO - CATEGORÍAS DE CLASIFICACIÓN
@@ -101,11 +173,118 @@ CATEGORIAS_VALIDAS = [
     "COMUNICACION_INTERNA"
 ]
 
+# Variantes aceptadas de cada categoría (nombre exacto y plural) -> nombre canónico.
+# Cualquier otra categoría se marca como REVISION_MANUAL
+_CATEGORIA_CANONICA = {variant: cat for cat in CATEGORIAS_VALIDAS for variant in (cat, cat + "S")}
+_CATEGORIA_CANONICA["REVISION_MANUAL"] = "REVISION_MANUAL"
+
+# Palabras clave (minúsculas y sin tildes) para la clasificación por reglas, sin LLM
+_KEYWORDS = {
+    "QUEJA_RECLAMO": {"reclamo", "peticion", "solicito", "inconformidad", "derecho de peticion",
+                      "estatuto del consumidor", "pretensiones", "garantia legal"},
+    "CONTRATO": {"contratante", "contratista", "clausulas", "objeto del contrato", "prestacion de servicios",
+                 "forma de pago", "merito ejecutivo", "domicilio contractual"},
+    "RESOLUCION_ADMINISTRATIVA": {"resolucion numero", "resolucion no", "resuelve", "considerando",
+                                  "articulo primero", "notifiquese", "cumplase"},
+    "INFORME_TECNICO": {"informe tecnico", "informe de gestion", "diagnostico", "objetivo", "alcance",
+                        "metodologia", "hallazgos", "conclusiones"},
+    "COMUNICACION_INTERNA": {"memorando", "circular", "para:", "de:", "asunto:", "cordial saludo"},
+}
+FAST_MIN_HITS = 3    # Mínimo de palabras clave distintas de la categoría ganadora
+FAST_MIN_MARGIN = 2  # Ventaja mínima sobre la segunda categoría
+
+# Prompt del sistema: parte invariante del prompt (rol, definiciones, instrucciones y
+# formato). Al ser idéntico en todas las solicitudes, Ollama reutiliza su KV-cache y
+# solo procesa el texto de cada documento, que viaja en el mensaje del usuario.
+SYSTEM_PROMPT = f"""Eres un asistente administrativo experto que SOLO habla en JSON. No incluyas explicaciones, markdown ni texto adicional.
+
+OBJETIVO: Clasificar cada uno de los documentos proporcionados según las siguientes definiciones estrictas.
+
+DEFINICIONES:
+{DEFINICIONES_CATEGORIAS}
+INSTRUCCIONES:
+1. Recibirás un JSON {{"documents": [{{"id": <int>, "text": "..."}}, ...]}}. Clasifica cada documento por separado.
+2. Busca palabras clave específicas de las definiciones.
+3. Determina la categoría más probable.
+4. Asigna un score de confianza (0.0 a 1.0).
+
+RESPONDE ÚNICAMENTE CON ESTE FORMATO JSON RAW (Sin Markdown), con un resultado por documento:
+{{"results": [{{"id": <int>, "categoria": "NOMBRE_CATEGORIA", "score": <float>, "evidencia": "palabras clave encontradas"}}]}}"""
+
+# Bloques de código markdown que el LLM a veces agrega alrededor del JSON
+_FENCE_RE = re.compile(r'```(?:json)?|```')
+
+# Esquema JSON de la respuesta. Ollama lo usa como gramática durante la decodificación,
+# de modo que el modelo solo puede devolver un objeto válido con una categoría conocida.
+RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "results": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "id": {"type": "integer"},
+                    "categoria": {"type": "string", "enum": CATEGORIAS_VALIDAS + ["REVISION_MANUAL"]},
+                    "score": {"type": "number"},
+                    "evidencia": {"type": "string"}
+                },
+                "required": ["id", "categoria", "score", "evidencia"]
+            }
+        }
+    },
+    "required": ["results"]
+}
+
 # =============================================================================
 # FUNCIONES DE EXTRACCIÓN DE TEXTO
 # =============================================================================
 
-def extract_text_smart(doc: fitz.Document, max_chars: int = 4000) -> str:
+@lru_cache(maxsize=None)
+def get_tokenizer() -> Optional["tiktoken.Encoding"]:
+    """
+    Carga (una vez por proceso) el tokenizador usado para limitar el prompt por tokens.
+    
+    cl100k_base no es el tokenizador exacto de Qwen, pero su conteo es cercano y basta
+    para acotar el tamaño del prompt. tiktoken descarga el archivo BPE la primera vez;
+    la imagen Docker lo deja en TIKTOKEN_CACHE_DIR. Si no se puede cargar (ej: sin red
+    y sin caché), se retorna None y el texto se recorta por caracteres.
+    
+    Returns:
+        tiktoken.Encoding | None: Tokenizador, o None si no está disponible.
+    """
+    try:
+        return tiktoken.get_encoding('cl100k_base')
+    except Exception as e:
+        print(f"Aviso: tokenizador no disponible, se recorta por caracteres: {str(e)[:100]}")
+        return None
+
+def collapse_whitespace(text: str, limit: int) -> str:
+    """
+    Convierte múltiples espacios/saltos de línea en un solo espacio y devuelve como
+    máximo `limit` caracteres.
+    
+    str.split() sin argumentos corre en C y ya descarta los extremos. Para textos muy
+    largos (ej: una última página con 100k+ caracteres) solo se procesa el prefijo
+    necesario, duplicándolo hasta reunir `limit` caracteres; el resultado es idéntico
+    a normalizar el texto completo y luego recortarlo.
+    
+    Args:
+        text (str): Texto crudo extraído del PDF.
+        limit (int): Máximo de caracteres del resultado.
+    
+    Returns:
+        str: Texto normalizado de longitud <= limit.
+    """
+    size = limit
+    while True:
+        collapsed = ' '.join(text[:size].split())
+        if len(collapsed) >= limit or size >= len(text):
+            return collapsed[:limit]
+        size *= 2
+
+def extract_text_smart(doc: fitz.Document, max_tokens: int = 1000,
+                       first_page_text: Optional[str] = None) -> str:
     """
     Extrae texto de un documento PDF de forma inteligente para clasificación.
     
@@ -122,230 +301,553 @@ def extract_text_smart(doc: fitz.Document, max_chars: int = 4000) -> str:
     
     Args:
         doc (fitz.Document): Documento PDF abierto con PyMuPDF.
-        max_chars (int, optional): Máximo de caracteres a extraer. Default: 4000.
-            Este límite previene el envío de textos excesivamente largos al LLM.
+        max_tokens (int, optional): Máximo de tokens a extraer. Default: 1000.
+            Este límite previene el envío de textos excesivamente largos al LLM y
+            mantiene predecible el tiempo de prefill (tablas o códigos generan muchos
+            más tokens por carácter que la prosa).
+        first_page_text (str, optional): Texto de la primera página si el llamador ya lo
+            extrajo (ej: para detectar escaneos), de modo que no se extraiga dos veces.
     
     Returns:
         str: Texto extraído y limpiado, listo para enviar al clasificador.
     
     Example:
-        >>> doc = fitz.open("documento.pdf")
-        >>> texto = extract_text_smart(doc, max_chars=3000)
-        >>> print(len(texto))  # <= 3000
+        >>> with fitz.open("documento.pdf") as doc:
+        ...     texto = extract_text_smart(doc, max_tokens=800)
+        >>> print(len(get_tokenizer().encode(texto)))  # <= 800
     
     Note:
         Si el documento es una imagen escaneada sin OCR, retornará un texto
-        muy corto o vacío. Esto se detecta en process_pdf() para marcarlo
+        muy corto o vacío. Esto se detecta en extract_from_path() para marcarlo
         como REVISION_MANUAL.
     """
     full_text = ""
-    total_pages = len(doc)
+    # page_count y load_page() solo cargan las páginas que se usan (máximo 3),
+    # sin recorrer el resto del documento
+    total_pages = doc.page_count
     
     # PASO 1: Extraer primera página completa
     # Contiene: título, encabezado institucional, número de resolución, etc.
-    if total_pages > 0:
-        full_text += doc[0].get_text("text") + "\n"
+    if first_page_text is not None:
+        full_text += first_page_text + "\n"
+    elif total_pages > 0:
+        full_text += doc.load_page(0).get_text("text", flags=TEXT_FLAGS) + "\n"
         
     # PASO 2: Extraer inicio de segunda página (máximo 500 caracteres)
     # Proporciona contexto adicional sin consumir demasiados tokens
     if total_pages > 1:
-        full_text += doc[1].get_text("text")[:500] + "\n"
+        full_text += doc.load_page(1).get_text("text", flags=TEXT_FLAGS)[:500] + "\n"
         
     # PASO 3: Extraer última página para documentos largos (>2 páginas)
     # Captura: firmas, sellos, conclusiones, pie de página institucional
     if total_pages > 2:
         full_text += "\n...[CONTENIDO OMITIDO]...\n"  # Indicador para el LLM
-        full_text += doc[total_pages - 1].get_text("text")
-
-    # LIMPIEZA: Normalizar espacios en blanco para optimizar tokens
-    # Convierte múltiples espacios/saltos de línea en un solo espacio
-    cleaned_text = re.sub(r'\s+', ' ', full_text).strip()
-    
-    return cleaned_text[:max_chars]
+        full_text += doc.load_page(total_pages - 1).get_text("text", flags=TEXT_FLAGS)
+
+    # LIMPIEZA: Normalizar espacios en blanco para optimizar tokens y precortar con un
+    # margen amplio de caracteres por token, para no procesar ni tokenizar páginas
+    # enteras que de todas formas se descartarían
+    candidate = collapse_whitespace(full_text, max_tokens * MAX_CHARS_PER_TOKEN)
+    
+    # RECORTE POR TOKENS (o por caracteres si no hay tokenizador)
+    tokenizer = get_tokenizer()
+    if tokenizer is None:
+        return candidate[:max_tokens * AVG_CHARS_PER_TOKEN]
+    token_ids = tokenizer.encode(candidate)
+    if len(token_ids) <= max_tokens:
+        return candidate
+    return tokenizer.decode(token_ids[:max_tokens])
 
 # =============================================================================
 # LÓGICA CORE DE CLASIFICACIÓN (TEXT ONLY)
 # =============================================================================
 
-def classify_document_text_only(text_content: str) -> Dict[str, Union[str, float]]:
+def fast_classify(text_content: str) -> Union[Dict[str, Union[str, float]], None]:
+    """
+    Clasificación por reglas: si el texto contiene suficientes palabras clave de una sola
+    categoría, se asigna sin invocar el LLM.
+    
+    Args:
+        text_content (str): Texto extraído del documento.
+    
+    Returns:
+        dict | None: Resultado con keys {'categoria', 'score', 'evidencia'} si una categoría
+            domina con claridad (FAST_MIN_HITS y FAST_MIN_MARGIN), o None para continuar
+            con el LLM.
+    
+    Example:
+        >>> fast_classify("RESOLUCIÓN No. 12 ... CONSIDERANDO ... RESUELVE: ARTÍCULO PRIMERO ...")
+        {"categoria": "RESOLUCION_ADMINISTRATIVA", "score": 0.85, "evidencia": "Palabras clave: articulo primero, considerando, resolucion no, resuelve"}
+    """
+    # Minúsculas y sin tildes, una sola vez para todas las búsquedas
+    normalizado = unicodedata.normalize('NFKD', text_content.lower())
+    normalizado = normalizado.encode('ascii', 'ignore').decode('ascii')
+    
+    # Palabras clave distintas encontradas por categoría (búsqueda de subcadena, igual que
+    # en main_clasificacion_1.py: "derecho de peticion" cuenta también como "peticion")
+    hits = {cat: [kw for kw in kws if kw in normalizado] for cat, kws in _KEYWORDS.items()}
+    
+    ranking = sorted(hits, key=lambda cat: len(hits[cat]), reverse=True)
+    top, second = ranking[0], ranking[1]
+    
+    if len(hits[top]) >= FAST_MIN_HITS and len(hits[top]) - len(hits[second]) >= FAST_MIN_MARGIN:
+        return {
+            "categoria": top,
+            "score": 0.85,
+            "evidencia": "Palabras clave: " + ", ".join(sorted(hits[top]))
+        }
+    return None
+
+def _normalize_result(item: Dict[str, Any]) -> Dict[str, Union[str, float]]:
+    """
+    Valida la categoría y acota el score de un resultado devuelto por el LLM.
+    
+    Args:
+        item (dict): Elemento de "results" en la respuesta del modelo.
+    
+    Returns:
+        Dict[str, Union[str, float]]: Resultado con "categoria", "score" y "evidencia".
+    """
+    # El enum del esquema garantiza la categoría; se valida por si el servidor lo ignora.
+    # Una sola consulta al diccionario resuelve mayúsculas, espacios y plurales.
+    cat = str(item.get("categoria", "")).strip().upper().replace(" ", "_")
+    cat = _CATEGORIA_CANONICA.get(cat, "REVISION_MANUAL")
+    
+    # Score como número o string (ej: "0,85" con coma decimal); si falta o no es
+    # convertible (ej: null) se usa 0.5, sin afectar a los demás documentos del lote
+    try:
+        score = float(str(item.get("score", 0.5)).replace(",", "."))
+    except (TypeError, ValueError):
+        score = 0.5
+    
+    return {
+        "categoria": cat,
+        "score": max(0.0, min(1.0, score)),  # Asegurar rango [0.0, 1.0]
+        "evidencia": item.get("evidencia", "Sin evidencia")
+    }
+
+async def classify_batch(texts: List[str]) -> List[Dict[str, Union[str, float]]]:
     """
-    Clasifica un documento basándose únicamente en su contenido textual.
+    Clasifica un lote de documentos basándose únicamente en su contenido textual.
     
-    Envía el texto extraído al modelo LLM junto con las definiciones de categorías,
-    y procesa la respuesta JSON para obtener la clasificación.
+    Envía hasta BATCH_SIZE textos en una sola petición al modelo LLM (las definiciones
+    de categorías viajan una sola vez en SYSTEM_PROMPT) y procesa la respuesta JSON,
+    que contiene un resultado por documento identificado por su posición en el lote.
     
     Args:
-        text_content (str): Texto extraído del documento PDF a clasificar.
-            Debe estar limpio y con longitud razonable (< 4000 caracteres).
+        texts (List[str]): Textos extraídos de los PDFs a clasificar.
+            Cada uno debe estar limpio y con longitud razonable (<= 1000 tokens).
     
     Returns:
-        Dict[str, Union[str, float]]: Diccionario con el resultado de clasificación:
+        List[Dict[str, Union[str, float]]]: Un resultado por texto, en el mismo orden:
             - "categoria" (str): Categoría asignada (ej: "CONTRATO", "REVISION_MANUAL")
             - "score" (float): Nivel de confianza entre 0.0 y 1.0
             - "evidencia" (str): Palabras clave encontradas que justifican la clasificación
     
     Example:
-        >>> texto = "RESOLUCION No. 123 Por medio de la cual RESUELVE..."
-        >>> result = classify_document_text_only(texto)
-        >>> print(result)
+        >>> textos = ["RESOLUCION No. 123 Por medio de la cual RESUELVE...",
+        ...           "MEMORANDO Para: Gerencia De: Sistemas Asunto: ..."]
+        >>> results = asyncio.run(classify_batch(textos))
+        >>> print(results[0])
         {"categoria": "RESOLUCION_ADMINISTRATIVA", "score": 0.95, "evidencia": "RESOLUCION No, RESUELVE"}
     
     Posibles categorías de retorno:
         - Categorías válidas: Las definidas en CATEGORIAS_VALIDAS
-        - REVISION_MANUAL: Cuando no se puede determinar la categoría o el JSON es inválido
-        - ERROR: Cuando ocurre una excepción durante el procesamiento
+        - REVISION_MANUAL: Cuando el modelo no puede determinar la categoría, el JSON es
+          inválido o la respuesta omite el documento
+        - ERROR: Cuando ocurre una excepción durante el procesamiento (afecta a todo el lote)
     
     Note:
         - Usa temperature=0.0 para resultados determinísticos
         - Usa seed=42 para reproducibilidad entre ejecuciones
+        - Usa response_format de tipo json_schema con RESPONSE_SCHEMA (salida estructurada)
     """
-    
-    # Construcción del prompt con instrucciones detalladas para el LLM
-    prompt_sistema = f"""Eres un experto analista documental.
-    
-    OBJETIVO: Clasificar el texto proporcionado según las siguientes definiciones estrictas.
-    
-    DEFINICIONES:
-    {DEFINICIONES_CATEGORIAS}
-
-    CONTENIDO DEL DOCUMENTO:
-    "{text_content}"
-
-    INSTRUCCIONES:
-    1. Busca palabras clave específicas de las definiciones.
-    2. Determina la categoría más probable.
-    3. Asigna un score de confianza (0.0 a 1.0).
-    
-    RESPONDE ÚNICAMENTE CON ESTE FORMATO JSON RAW (Sin Markdown):
-    {{"categoria": "NOMBRE_CATEGORIA", "score": <float>, "evidencia": "palabras clave encontradas"}}"""
+    documents = {"documents": [{"id": i, "text": text} for i, text in enumerate(texts)]}
 
     try:
         # Llamada al modelo LLM vía API compatible con OpenAI
-        response = client.chat.completions.create(
+        response = await aclient.chat.completions.create(
             model=MODEL_NAME,
             messages=[
-                {
-                    "role": "system", 
-                    "content": "Eres un asistente administrativo experto que SOLO habla en JSON. No incluyas explicaciones, markdown ni texto adicional."
-                },
-                {"role": "user", "content": prompt_sistema}
+                # Prefijo constante (definiciones e instrucciones): reutilizable por el KV-cache
+                {"role": "system", "content": SYSTEM_PROMPT},
+                # Solo el contenido de los documentos cambia entre solicitudes
+                {"role": "user", "content": orjson.dumps(documents).decode('utf-8')}
             ],
-            max_tokens=300,       # Suficiente para el JSON de respuesta
+            max_tokens=300 * len(texts),  # Suficiente para el JSON de cada documento
             temperature=0.0,      # Determinismo máximo para consistencia
             seed=42,              # Semilla fija para reproducibilidad
+            # Salida estructurada: la decodificación queda restringida a RESPONSE_SCHEMA
+            response_format={
+                "type": "json_schema",
+                "json_schema": {"name": "clasificacion", "schema": RESPONSE_SCHEMA}
+            },
         )
         
-        content = response.choices[0].message.content.strip()
-        
         # ==== LIMPIEZA Y PARSING DEL JSON ====
-        # El LLM a veces envuelve el JSON en bloques de código markdown
-        cleaned = re.sub(r'```(?:json)?|```', '', content).strip()
-        # Eliminar cualquier texto antes del primer '{'
-        cleaned = re.sub(r'^[^{]*', '', cleaned)
-        # Eliminar cualquier texto después del último '}'
-        cleaned = re.sub(r'[^}]*$', '', cleaned)
+        # Con el esquema activo la respuesta ya es JSON puro; la limpieza cubre servidores
+        # que lo ignoran y envuelven el JSON en bloques de código markdown
+        cleaned = _FENCE_RE.sub('', response.choices[0].message.content or '')
+        # Conservar solo lo que hay entre el primer '{' y el último '}'
+        start, end = cleaned.find('{'), cleaned.rfind('}')
+        cleaned = cleaned[start:end + 1] if start >= 0 and end > start else ''
+        try:
+            parsed = orjson.loads(cleaned)
+        except orjson.JSONDecodeError:
+            # Respuesta truncada (ej: max_tokens alcanzado) o servidor sin soporte de esquemas
+            return [{"categoria": "REVISION_MANUAL", "score": 0.0, "evidencia": "JSON ilegible"}
+                    for _ in texts]
         
-        if cleaned:
-            result = json.loads(cleaned)
-            
-            # ==== NORMALIZACIÓN DE CATEGORÍA ====
-            # Convertir a mayúsculas y reemplazar espacios por guiones bajos
-            cat = result.get("categoria", "").upper().replace(" ", "_")
-            # Manejar plurales incorrectos (ej: "CONTRATOS" -> "CONTRATO")
-            if cat.endswith("S") and cat[:-1] in CATEGORIAS_VALIDAS: 
-                cat = cat[:-1]
-            # Validar que sea una categoría conocida
-            if cat not in CATEGORIAS_VALIDAS: 
-                cat = "REVISION_MANUAL"
-            
-            # ==== NORMALIZACIÓN DEL SCORE ====
-            score = result.get("score", 0.5)
-            if isinstance(score, str):
-                # Manejar scores como string (ej: "0,85" con coma decimal)
-                try: 
-                    score = float(score.replace(",", "."))
-                except: 
-                    score = 0.5
-            
-            return {
-                "categoria": cat,
-                "score": max(0.0, min(1.0, score)),  # Asegurar rango [0.0, 1.0]
-                "evidencia": result.get("evidencia", "Sin evidencia")
-            }
-        else:
-            # JSON vacío o malformado
-            return {"categoria": "REVISION_MANUAL", "score": 0.0, "evidencia": "JSON ilegible"}
+        # Elementos que no son objetos se ignoran (el documento queda como omitido)
+        by_id = {item.get("id"): item for item in parsed.get("results", []) if isinstance(item, dict)}
+        return [
+            _normalize_result(by_id[i]) if i in by_id
+            else {"categoria": "REVISION_MANUAL", "score": 0.0, "evidencia": "Documento omitido en la respuesta del lote"}
+            for i in range(len(texts))
+        ]
             
     except Exception as e:
         # Capturar cualquier error (conexión, timeout, parsing, etc.)
-        return {"categoria": "ERROR", "score": 0.0, "evidencia": str(e)[:100]}
+        return [{"categoria": "ERROR", "score": 0.0, "evidencia": str(e)[:100]} for _ in texts]
+
+# =============================================================================
+# CACHÉ DE RESPUESTAS DEL LLM (EXACTA Y SEMÁNTICA)
+# =============================================================================
+# - Caché exacta: documentos con texto idéntico (hash SHA-256) reutilizan la respuesta.
+# - Caché semántica: documentos casi idénticos (misma plantilla, otros nombres o fechas)
+#   se detectan con MinHash + LSH sobre trigramas de palabras y reutilizan la categoría
+#   de un documento previo clasificado con alta confianza.
+
+def cache_key(text_content: str) -> str:
+    """
+    Calcula la clave de caché de un documento: SHA-256 del modelo, el prompt del
+    sistema (incluye las definiciones de categorías) y el texto extraído. Cambiar el
+    modelo o el prompt invalida automáticamente las entradas anteriores.
+    
+    Args:
+        text_content (str): Texto extraído del documento.
+    
+    Returns:
+        str: Hash hexadecimal de 64 caracteres.
+    """
+    payload = f"{MODEL_NAME}|{SYSTEM_PROMPT}|{text_content}"
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def _minhash(text_content: str) -> MinHash:
+    """
+    Calcula la firma MinHash del texto a partir de sus trigramas de palabras.
+    
+    Args:
+        text_content (str): Texto extraído del documento.
+    
+    Returns:
+        MinHash: Firma con SEMCACHE_NUM_PERM permutaciones.
+    """
+    words = text_content.lower().split()
+    shingles = {" ".join(words[i:i + 3]) for i in range(max(1, len(words) - 2))}
+    signature = MinHash(num_perm=SEMCACHE_NUM_PERM)
+    for shingle in shingles:
+        signature.update(shingle.encode('utf-8'))
+    return signature
+
+def load_semantic_cache() -> dict:
+    """
+    Carga la caché semántica desde SEMCACHE_PATH, o crea una vacía si no existe.
+    
+    La caché guardada se descarta si fue generada con otro modelo o con otro prompt
+    del sistema, igual que ocurre con las claves de la caché exacta (cache_key()).
+    
+    Returns:
+        dict: {"fingerprint": str, "lsh": MinHashLSH, "results": {clave: resultado}}
+    """
+    fingerprint = hashlib.sha256(f"{MODEL_NAME}|{SYSTEM_PROMPT}".encode('utf-8')).hexdigest()
+    if os.path.exists(SEMCACHE_PATH):
+        with open(SEMCACHE_PATH, 'rb') as f:
+            semcache = pickle.load(f)
+        if semcache.get("fingerprint") == fingerprint:
+            return semcache
+    return {
+        "fingerprint": fingerprint,
+        "lsh": MinHashLSH(threshold=SEMCACHE_THRESHOLD, num_perm=SEMCACHE_NUM_PERM),
+        "results": {}
+    }
+
+def save_semantic_cache(semcache: dict) -> None:
+    """Persiste la caché semántica en SEMCACHE_PATH."""
+    with open(SEMCACHE_PATH, 'wb') as f:
+        pickle.dump(semcache, f)
+
+def semantic_lookup(semcache: dict, text_content: str) -> Union[Dict[str, Union[str, float]], None]:
+    """
+    Busca un documento previo casi idéntico en la caché semántica.
+    
+    Args:
+        semcache (dict): Caché cargada con load_semantic_cache().
+        text_content (str): Texto extraído del documento.
+    
+    Returns:
+        dict | None: Resultado reutilizado (con la evidencia marcada como caché semántica),
+            o None si no hay coincidencias.
+    """
+    for key in semcache["lsh"].query(_minhash(text_content)):
+        previous = semcache["results"][key]
+        return {
+            "categoria": previous["categoria"],
+            "score": previous["score"],
+            "evidencia": f"Caché semántica (documento similar): {previous['evidencia']}"
+        }
+    return None
+
+def semantic_store(semcache: dict, text_content: str, result: Dict[str, Union[str, float]]) -> None:
+    """
+    Agrega un resultado a la caché semántica. Solo se guardan clasificaciones válidas
+    con score >= SEMCACHE_MIN_SCORE, para no propagar respuestas dudosas.
+    
+    Args:
+        semcache (dict): Caché cargada con load_semantic_cache().
+        text_content (str): Texto extraído del documento.
+        result (dict): Resultado de classify_batch().
+    """
+    if result.get("categoria") not in CATEGORIAS_VALIDAS or result.get("score", 0.0) < SEMCACHE_MIN_SCORE:
+        return
+    key = cache_key(text_content)
+    if key not in semcache["results"]:
+        semcache["lsh"].insert(key, _minhash(text_content))
+        semcache["results"][key] = result
 
 # =============================================================================
 # FUNCIÓN DE PROCESAMIENTO DE PDF
 # =============================================================================
 
-def process_pdf(input_path: str) -> dict:
+def extract_from_path(input_path: str) -> Union[str, Dict[str, Union[str, float]]]:
     """
-    Procesa un archivo PDF individual y retorna su clasificación.
+    Abre un archivo PDF y extrae su texto para clasificación.
     
-    Esta función actúa como orquestador del pipeline de clasificación:
+    Se ejecuta en los procesos del pool de extracción, por lo que no realiza
+    llamadas al LLM. Los casos que no requieren clasificación se resuelven aquí:
     1. Abre el archivo PDF
-    2. Valida que tenga contenido
+    2. Valida que tenga contenido y descarta escaneos mirando solo la primera página
     3. Extrae el texto de forma inteligente
-    4. Envía el texto al clasificador LLM
-    5. Retorna el resultado
+    4. Intenta clasificarlo por palabras clave (fast_classify)
     
     Args:
         input_path (str): Ruta absoluta al archivo PDF a procesar.
     
     Returns:
-        dict: Diccionario con el resultado de clasificación:
-            - "categoria" (str): Categoría asignada al documento
-            - "score" (float): Nivel de confianza (0.0 - 1.0)
-            - "evidencia" (str): Justificación de la clasificación
+        str | dict: Texto extraído listo para el clasificador, o un diccionario
+            de resultado final (mismas keys que classify_batch)
+            cuando el documento no puede clasificarse.
     
     Categorías especiales de error:
         - VACIO: El PDF no tiene páginas
         - REVISION_MANUAL: PDF es imagen escaneada sin OCR (< 50 caracteres)
         - ARCHIVO_CORRUPTO: Error al abrir o procesar el archivo
     
-    Example:
-        >>> result = process_pdf("/data/contrato_2024.pdf")
-        >>> print(result)
-        {"categoria": "CONTRATO", "score": 0.92, "evidencia": "Contratante, Cláusulas"}
+    Los documentos clasificados por reglas también se devuelven como diccionario.
     """
     try:
-        # Abrir el documento PDF con PyMuPDF
-        doc = fitz.open(input_path)
-        
-        # Validación: Documento sin páginas
-        if len(doc) == 0: 
-            return {"categoria": "VACIO", "score": 0.0, "evidencia": "Sin páginas"}
-
-        # Extracción inteligente de texto (Inicio + Final del documento)
-        text_content = extract_text_smart(doc)
+        # Abrir el documento PDF con PyMuPDF; el bloque with lo cierra
+        # incluso si la extracción falla
+        with fitz.open(input_path, filetype='pdf') as doc:
+            # Validación: Documento sin páginas (page_count no carga ninguna página)
+            if doc.page_count == 0: 
+                return {"categoria": "VACIO", "score": 0.0, "evidencia": "Sin páginas"}
+
+            # Detección temprana de escaneos: si la primera página tiene imágenes y casi
+            # nada de texto, se descarta sin extraer la segunda ni la última página
+            first_page = doc.load_page(0)
+            first_page_text = first_page.get_text("text", flags=TEXT_FLAGS)
+            if len(first_page_text.strip()) < 20 and first_page.get_images():
+                return {
+                    "categoria": "REVISION_MANUAL", 
+                    "score": 0.0, 
+                    "evidencia": "PDF es imagen (sin capa de texto)"
+                }
+
+            # Extracción inteligente de texto (Inicio + Final del documento)
+            text_content = extract_text_smart(doc, first_page_text=first_page_text)
         
         # Validación: PDF es imagen escaneada (sin capa de texto extraíble)
         # Si el texto extraído es muy corto, probablemente es un escaneo
         if len(text_content) < 50:
-             doc.close()
              return {
                  "categoria": "REVISION_MANUAL", 
                  "score": 0.0, 
                  "evidencia": "PDF es imagen (sin capa de texto)"
              }
-
-        # Clasificación mediante LLM
-        result = classify_document_text_only(text_content)
         
-        # Cerrar el documento para liberar recursos
-        doc.close()
-        return result
+        # Clasificación por reglas: evidencia clara de palabras clave, no se consulta al LLM
+        rule_result = fast_classify(text_content)
+        if rule_result is not None:
+            return rule_result
+
+        return text_content
         
     except Exception as e:
         # Capturar errores de archivo (corrupto, protegido, formato inválido)
         return {"categoria": "ARCHIVO_CORRUPTO", "score": 0.0, "evidencia": str(e)}
 
+async def warmup_model() -> None:
+    """
+    Carga el modelo en memoria antes de la primera clasificación.
+    
+    Una petición a /api/generate sin prompt hace que Ollama cargue los pesos del modelo;
+    OLLAMA_KEEP_ALIVE los mantiene residentes un tiempo limitado, de modo que se liberan
+    al terminar la ejecución. Si falla, solo se informa: la primera clasificación cargará
+    el modelo de todas formas.
+    """
+    try:
+        response = await http_client.post(
+            f"{OLLAMA_NATIVE_URL}/api/generate",
+            json={"model": MODEL_NAME, "keep_alive": OLLAMA_KEEP_ALIVE}
+        )
+        response.raise_for_status()
+    except Exception as e:
+        print(f"Aviso: no se pudo precargar el modelo {MODEL_NAME}: {str(e)[:100]}")
+
+async def classify_all(pdf_files: list,
+                       on_result: Optional[Callable[[int, Dict[str, Union[str, float]]], None]] = None) -> list:
+    """
+    Clasifica todos los PDFs en un pipeline productor/consumidor unido por una asyncio.Queue.
+    
+    Productor: extrae el texto de los PDFs en el pool de PDF_WORKERS procesos y atiende
+    cada uno en cuanto termina. Los textos ya clasificados en ejecuciones anteriores se
+    resuelven desde la caché en disco (LLM_CACHE_PATH) o, si son casi idénticos a uno
+    previo, desde la caché semántica (SEMCACHE_PATH), sin llamar al LLM. El resto se
+    acumula en una ventana de BATCH_SIZE * OLLAMA_NUM_PARALLEL textos que se ordena por
+    longitud y se encola en lotes de BATCH_SIZE, de modo que las peticiones simultáneas
+    tengan tiempos de procesamiento similares.
+    Consumidores: OLLAMA_NUM_PARALLEL corrutinas toman lotes de la cola y los envían al LLM.
+    Mientras el modelo procesa un lote, el pool ya extrae los PDFs siguientes.
+    El modelo se precarga (warmup_model) apenas un documento necesita el LLM, en paralelo
+    con las extracciones que completan el primer lote; si todo se resuelve por reglas o
+    caché, no se carga.
+    
+    Args:
+        pdf_files (list): Rutas de los PDFs a clasificar.
+        on_result (callable, optional): Se invoca como on_result(i, resultado) apenas se
+            conoce el resultado del PDF pdf_files[i], para guardarlo de forma incremental.
+    
+    Returns:
+        list: Resultados de clasificación en el mismo orden que pdf_files.
+    """
+    loop = asyncio.get_running_loop()
+    results = [None] * len(pdf_files)
+    
+    def record(i: int, result: Dict[str, Union[str, float]]) -> None:
+        results[i] = result
+        if on_result is not None:
+            on_result(i, result)
+    
+    # Lotes pendientes de clasificar; None indica a cada consumidor que termine.
+    # El tamaño máximo frena al productor si el LLM se queda atrás.
+    queue = asyncio.Queue(maxsize=2 * OLLAMA_NUM_PARALLEL)
+    window_size = BATCH_SIZE * OLLAMA_NUM_PARALLEL
+    semcache = load_semantic_cache()
+    
+    # La caché semántica se guarda aunque la ejecución se interrumpa
+    try:
+        with shelve.open(LLM_CACHE_PATH) as cache, ProcessPoolExecutor(max_workers=PDF_WORKERS) as executor:
+        
+            async def extract(i: int, pdf_path: str) -> tuple:
+                return i, await loop.run_in_executor(executor, extract_from_path, pdf_path)
+        
+            warmup_tasks = []
+            
+            async def producer() -> None:
+                window = []
+            
+                async def flush_window() -> None:
+                    # Lotes de longitud similar dentro de la ventana
+                    window.sort(key=lambda pair: len(pair[1]))
+                    for j in range(0, len(window), BATCH_SIZE):
+                        await queue.put(window[j:j + BATCH_SIZE])
+                    window.clear()
+            
+                # Extracción de texto (CPU, en paralelo), atendida en orden de finalización
+                for next_extracted in asyncio.as_completed([extract(i, p) for i, p in enumerate(pdf_files)]):
+                    i, item = await next_extracted
+                
+                    # Los PDFs que no requieren LLM (vacíos, escaneados, corruptos o clasificados
+                    # por reglas) ya tienen resultado
+                    if isinstance(item, dict):
+                        record(i, item)
+                        continue
+                
+                    # Documentos ya clasificados en ejecuciones anteriores (idénticos o casi
+                    # idénticos): se reutiliza la respuesta
+                    cached = cache.get(cache_key(item)) or semantic_lookup(semcache, item)
+                    if cached is not None:
+                        record(i, cached)
+                        continue
+                
+                    # Primer documento que necesita el LLM: se precarga el modelo mientras
+                    # se extraen los demás documentos del primer lote
+                    if not warmup_tasks:
+                        warmup_tasks.append(asyncio.create_task(warmup_model()))
+                    window.append((i, item))
+                    if len(window) >= window_size:
+                        await flush_window()
+            
+                await flush_window()
+                for _ in range(OLLAMA_NUM_PARALLEL):
+                    await queue.put(None)
+        
+            async def consumer() -> None:
+                while (batch := await queue.get()) is not None:
+                    batch_results = await classify_batch([text for _, text in batch])
+                    for (i, text), result in zip(batch, batch_results):
+                        record(i, result)
+                        # Solo se guardan clasificaciones válidas: los errores (conexión, timeout)
+                        # y los REVISION_MANUAL (JSON ilegible, documento omitido en el lote)
+                        # se reintentan en la siguiente ejecución
+                        if result.get("categoria") in CATEGORIAS_VALIDAS:
+                            cache[cache_key(text)] = result
+                            semantic_store(semcache, text, result)
+        
+            await asyncio.gather(producer(), *(consumer() for _ in range(OLLAMA_NUM_PARALLEL)))
+            await asyncio.gather(*warmup_tasks)
+    finally:
+        save_semantic_cache(semcache)
+    
+    return results
+
+# =============================================================================
+# RESULTADOS INCREMENTALES (CSV)
+# =============================================================================
+# Cada resultado se agrega al CSV apenas se obtiene. Si la ejecución se interrumpe,
+# la siguiente omite los archivos ya clasificados y el Excel se genera al final
+# a partir del CSV.
+
+CSV_HEADERS = ["archivo", "categoria", "score", "evidencia"]
+
+# Categorías que se vuelven a procesar al reanudar: fallos de conexión y respuestas
+# ilegibles o incompletas del LLM (los escaneos solo se vuelven a extraer, sin LLM)
+RETRY_CATEGORIES = {"ERROR", "REVISION_MANUAL"}
+
+def load_results_csv(csv_path: str) -> Dict[str, Dict[str, Union[str, float]]]:
+    """
+    Lee los resultados guardados por ejecuciones anteriores.
+    
+    Args:
+        csv_path (str): Ruta del CSV de resultados.
+    
+    Returns:
+        dict: {nombre de archivo: resultado}. Si un archivo aparece varias veces
+            (ej: un ERROR reintentado), se conserva la última fila.
+    """
+    if not os.path.exists(csv_path):
+        return {}
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        return {
+            row["archivo"]: {
+                "categoria": row["categoria"],
+                "score": float(row["score"]),
+                "evidencia": row["evidencia"]
+            }
+            for row in csv.DictReader(f)
+        }
+
 # =============================================================================
 # FUNCIÓN PRINCIPAL - PUNTO DE ENTRADA
 # =============================================================================
@@ -356,12 +858,17 @@ def main():
     
     Flujo de ejecución:
         1. Escanea la carpeta /data buscando archivos *.pdf
-        2. Procesa cada PDF secuencialmente
-        3. Muestra progreso en consola
-        4. Genera reporte Excel con resultados
+        2. Extrae el texto en un pool de PDF_WORKERS procesos y, a medida que se extrae,
+           lo clasifica con hasta OLLAMA_NUM_PARALLEL peticiones concurrentes al LLM
+        3. Guarda cada resultado en un CSV apenas se obtiene; los archivos ya presentes
+           en el CSV (salvo los de RETRY_CATEGORIES) se omiten, de modo que una ejecución interrumpida
+           se puede reanudar
+        4. Muestra progreso en consola a medida que se obtiene cada resultado
+        5. Genera reporte Excel con resultados a partir del CSV
     
     Configuración:
         - Carpeta de entrada: /data (configurable en input_folder)
+        - Resultados incrementales: /data/clasificacion_documentos_texto.csv
         - Archivo de salida: /data/clasificacion_documentos_texto.xlsx
     
     Estructura del reporte Excel:
@@ -381,6 +888,7 @@ def main():
     # Configuración de rutas
     input_folder = "/data"  # Carpeta donde se encuentran los PDFs
     output_excel = "/data/clasificacion_documentos_texto.xlsx"  # Ruta del reporte
+    output_csv = "/data/clasificacion_documentos_texto.csv"  # Resultados incrementales
 
     # Buscar todos los archivos PDF en la carpeta
     pdf_files = glob.glob(os.path.join(input_folder, '*.pdf'))
@@ -390,14 +898,52 @@ def main():
         print("No se encontraron PDFs.")
         return
 
-    print(f"Iniciando clasificación TEXT-ONLY de {len(pdf_files)} documentos...")
+    # Reanudación: se omiten los archivos ya clasificados (los ERROR y REVISION_MANUAL se reintentan)
+    saved = load_results_csv(output_csv)
+    pending_files = [p for p in pdf_files
+                     if saved.get(os.path.basename(p), {}).get("categoria", "ERROR") in RETRY_CATEGORIES]
+    
+    print(f"Iniciando clasificación TEXT-ONLY de {len(pending_files)} documentos "
+          f"({len(pdf_files) - len(pending_files)} ya clasificados)...")
+    
+    # ========================================================================
+    # PROCESAMIENTO DE DOCUMENTOS
+    # ========================================================================
+    # Cada resultado se escribe en el CSV (con flush) en cuanto se conoce
+    with open(output_csv, 'a', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        if f.tell() == 0:
+            writer.writerow(CSV_HEADERS)
+        
+        def save_result(i: int, result: Dict[str, Union[str, float]]) -> None:
+            filename = os.path.basename(pending_files[i])
+            writer.writerow([filename, result["categoria"], result["score"], result["evidencia"]])
+            f.flush()
+            saved[filename] = result
+            # Mostrar progreso en consola a medida que llegan los resultados
+            print(f"Analizando: {filename}... [{result.get('categoria')}]")
+        
+        if pending_files:
+            asyncio.run(classify_all(pending_files, on_result=save_result))
     
     # ========================================================================
     # CONFIGURACIÓN DEL ARCHIVO EXCEL
     # ========================================================================
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Clasificación Texto"
+    # Modo write_only: las filas se escriben a disco a medida que se agregan,
+    # sin mantener todas las celdas en memoria
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Clasificación Texto")
+    
+    # Configurar anchos de columna para mejor legibilidad
+    # (en modo write_only debe hacerse antes de agregar filas)
+    ws.column_dimensions['A'].width = 40   # Nombre de archivo
+    ws.column_dimensions['B'].width = 30   # Categoría
+    ws.column_dimensions['D'].width = 60   # Evidencia
+    ws.row_dimensions[1].height = 30       # Altura del encabezado
+    # Altura de las filas de datos: un solo valor por defecto de la hoja
+    # en lugar de una dimensión por fila
+    ws.sheet_format.defaultRowHeight = 50
+    ws.sheet_format.customHeight = True
     
     # Definir encabezados de columnas
     headers = ["Nombre de Archivo", "Categoría", "Score", "Evidencia"]
@@ -407,31 +953,22 @@ def main():
     header_fill = PatternFill(start_color='4472C4', fill_type='solid')  # Fondo azul
     
     # Aplicar encabezados con estilo
-    for col, h in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col, value=h)
+    header_row = []
+    for h in headers:
+        cell = WriteOnlyCell(ws, value=h)
         cell.font = header_font
         cell.fill = header_fill
-    
-    # Configurar anchos de columna para mejor legibilidad
-    ws.column_dimensions['A'].width = 40   # Nombre de archivo
-    ws.column_dimensions['B'].width = 30   # Categoría
-    ws.column_dimensions['D'].width = 60   # Evidencia
-    ws.row_dimensions[1].height = 30       # Altura del encabezado
+        header_row.append(cell)
+    ws.append(header_row)
     
     # ========================================================================
-    # PROCESAMIENTO DE DOCUMENTOS
+    # ESCRITURA DEL REPORTE
     # ========================================================================
-    row_num = 2  # Comenzar en la fila 2 (después del encabezado)
-    
+    # El Excel se escribe secuencialmente, en el orden de pdf_files, con los resultados
+    # de esta ejecución y de las anteriores
     for pdf_path in pdf_files:
         filename = os.path.basename(pdf_path)
-        print(f"Analizando: {filename}...", end=" ")
-        
-        # Procesar el PDF y obtener clasificación
-        result = process_pdf(pdf_path)
-        
-        # Mostrar resultado en consola
-        print(f"[{result.get('categoria')}]")
+        result = saved[filename]
         
         # Escribir resultado en Excel
         row_data = [
@@ -440,13 +977,7 @@ def main():
             result.get("score"), 
             result.get("evidencia")
         ]
-        for col, val in enumerate(row_data, 1):
-            ws.cell(row=row_num, column=col, value=val)
-        
-        # Establecer altura de la fila de datos
-        ws.row_dimensions[row_num].height = 50
-        
-        row_num += 1
+        ws.append(row_data)
     
     # ========================================================================
     # GUARDAR REPORTE